@@ -31,6 +31,11 @@ tests_require = {
 }
 
 extras_require = {
+    'async': {
+        'SQLAlchemy >= 1.4.0',
+        'aiosqlite >= 0.17.0',
+        'asyncpg >= 0.22.0',
+    },
     'tests': tests_require,
     'lint': {
         'flake8 >= 3.5.0',
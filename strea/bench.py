@@ -0,0 +1,258 @@
+""":mod:`strea.bench` --- micro benchmarks
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Micro benchmarks for hot paths. Run them with ``strea bench NAME``.
+
+"""
+
+import inspect
+import pathlib
+import subprocess
+import sys
+import tempfile
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+from .box import Box, Handler, compile_plan
+from .command import option
+from .type import cast
+
+__all__ = 'BENCHMARKS', 'benchmark'
+
+Result = List[Tuple[str, float]]
+
+#: (:class:`dict`) Registered benchmarks
+BENCHMARKS: Dict[str, Callable[[int], Result]] = {}
+
+
+def benchmark(name: str, *, number: int=10000):
+    """Register benchmark. ``number`` is default count of loops."""
+
+    def decorator(func):
+        func.number = number
+        BENCHMARKS[name] = func
+        return func
+
+    return decorator
+
+
+def make_handler(option_count: int) -> Handler:
+    """Make handler which has many options."""
+
+    async def callback(**kwargs):
+        pass
+
+    callback.__signature__ = inspect.Signature([  # type: ignore
+        inspect.Parameter(
+            f'opt{i}',
+            inspect.Parameter.KEYWORD_ONLY,
+            annotation=int,
+        ) for i in range(option_count)
+    ])
+
+    for i in reversed(range(option_count)):
+        callback = option(f'--opt{i}', default=i)(callback)
+
+    box = Box()
+    box.command('bench')(callback)
+    return box.handlers['message']['bench']
+
+
+@benchmark('parse-plan')
+def parse_plan(number: int) -> Result:
+    handler = make_handler(30)
+    chunk = ['--opt0', '1', '--opt15', '2', '--opt29', '3', 'argument']
+
+    def compile_per_call():
+        for o in handler.plan.options:
+            o.type_ = None
+        handler.plan = compile_plan(handler.callback, handler.signature)
+        handler.parse_options(list(chunk))
+
+    def precompiled():
+        handler.parse_options(list(chunk))
+
+    return [
+        ('compile per call', timeit.timeit(compile_per_call, number=number)),
+        ('precompiled plan', timeit.timeit(precompiled, number=number)),
+    ]
+
+
+def legacy_parse_options(handler: Handler, chunk: List[str]):
+    """Option scanning loop before cursor-based parser, for comparison.
+
+    It only supports single value options without container.
+
+    """
+
+    end = False
+    options = handler.plan.options
+    result: Dict[str, Any] = {}
+
+    while not end and chunk:
+        for o in options:
+            name = chunk.pop(0)
+            if name.startswith(o.name + '='):
+                name, new_chunk = name.split('=', 1)
+                chunk.insert(0, new_chunk)
+
+            if name == o.name:
+                args = [chunk.pop(0) for _ in range(o.nargs)]
+                result[o.dest] = cast(o.type_, args[0])
+                break
+
+            chunk.insert(0, name)
+        else:
+            end = True
+
+    return result, chunk
+
+
+@benchmark('parse-pathological')
+def parse_pathological(number: int) -> Result:
+    handler = make_handler(30)
+    chunk = ['--opt29', '1'] * 500 + ['--opt0=2'] * 500 + ['argument'] * 1000
+
+    def legacy():
+        legacy_parse_options(handler, list(chunk))
+
+    def cursor():
+        handler.parse_options(chunk)
+
+    return [
+        ('pop/insert', timeit.timeit(legacy, number=number)),
+        ('cursor', timeit.timeit(cursor, number=number)),
+    ]
+
+
+@benchmark('cast')
+def cast_nested(number: int) -> Result:
+    from typing import Dict, List, Optional, Union
+
+    from .type import _compile, compile_converter
+
+    cases = [
+        (Dict[str, List[int]], {str(i): ['1', '2', '3'] for i in range(10)}),
+        (Union[int, float, str], 'text'),
+        (Optional[List[Union[int, str]]], ['1', 'a', '2', 'b']),
+    ]
+    converters = [(compile_converter(t), value) for t, value in cases]
+
+    def compile_per_call():
+        for t, value in cases:
+            _compile(t)(value)
+
+    def cached():
+        for t, value in cases:
+            cast(t, value)
+
+    def precompiled():
+        for convert, value in converters:
+            convert(value)
+
+    return [
+        ('compile per call', timeit.timeit(compile_per_call, number=number)),
+        ('cached cast', timeit.timeit(cached, number=number)),
+        ('precompiled', timeit.timeit(precompiled, number=number)),
+    ]
+
+
+@benchmark('hangul')
+def hangul(number: int) -> Result:
+    import unicodedata
+
+    from .util import (KOREAN_END, KOREAN_START, decompose_hangul,
+                       hangul_table)
+
+    def legacy(value: str) -> str:
+        return ''.join(
+            unicodedata.normalize('NFD', x)
+            if KOREAN_START <= ord(x) <= KOREAN_END else x
+            for x in list(value)
+        )
+
+    text = '[자유분방한 땅요정] 스트레아 두근두근 발렌타인 스카우트'
+    table = hangul_table('nfd')
+
+    def uncached():
+        decompose_hangul.cache_clear()
+        decompose_hangul(text)
+
+    return [
+        ('per character', timeit.timeit(lambda: legacy(text), number=number)),
+        ('translate', timeit.timeit(
+            lambda: text.translate(table),
+            number=number,
+        )),
+        ('translate + cache miss', timeit.timeit(uncached, number=number)),
+        ('cache hit', timeit.timeit(
+            lambda: decompose_hangul(text),
+            number=number,
+        )),
+    ]
+
+
+@benchmark('dispatch', number=2000)
+def dispatch(number: int) -> Result:
+    import asyncio
+    import copy
+
+    from attrdict import AttrDict
+
+    from .config import DEFAULT
+    from .replay import make_bot, prepare_database, replay, synthetic_records
+
+    config = AttrDict(copy.deepcopy(DEFAULT))
+    config.update(
+        PREFIX='!',
+        HANDLERS=['strea.handlers.saomd'],
+        MODELS=['strea.models'],
+    )
+    bot, client = make_bot(config)
+    prepare_database(bot)
+    records = synthetic_records(number, config.PREFIX)
+
+    report = asyncio.get_event_loop().run_until_complete(
+        replay(bot, client, records)
+    )
+    return [('on_message', report.elapsed)]
+
+
+STARTUP_SCRIPT = """
+import copy
+from attrdict import AttrDict
+from strea.bot import Bot
+from strea.config import DEFAULT
+config = AttrDict(copy.deepcopy(DEFAULT))
+config.update(DATABASE_URL='sqlite://', HANDLER_MANIFEST={manifest!r},
+              HANDLERS=['strea.handlers.saomd'], MODELS=['strea.models'])
+Bot(config)
+"""
+
+
+@benchmark('startup', number=10)
+def startup(number: int) -> Result:
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory) / 'manifest.json'
+
+        def start(manifest: str):
+            subprocess.run(
+                [sys.executable, '-c', STARTUP_SCRIPT.format(
+                    manifest=manifest)],
+                check=True,
+            )
+
+        start(str(path))
+
+        return [
+            ('interpreter only', timeit.timeit(
+                lambda: subprocess.run([sys.executable, '-c', ''],
+                                       check=True),
+                number=number,
+            )),
+            ('eager import', timeit.timeit(lambda: start(''), number=number)),
+            ('lazy import', timeit.timeit(
+                lambda: start(str(path)),
+                number=number,
+            )),
+        ]
@@ -1,22 +1,51 @@
+import asyncio
 import html
 import importlib
+import logging
+import pathlib
+import random
 import re
-import shlex
-from typing import Any, Dict
+import time
+from typing import Any, Callable, Dict, Optional
 
 from attrdict import AttrDict
 
 from discord import Client, Message
 
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.event import listens_for
+from sqlalchemy.pool import StaticPool
 
+from . import manifest
 from .box import Box, box
-from .orm import Base, get_database_engine
-
-Session = sessionmaker(autocommit=True)
+from .command import invalidate_channel
+from .context import MessageContext
+from .executor import Executor
+from .log import setup_logging
+from .metrics import Registry, serve
+from .orm import (
+    Base,
+    async_session_scope,
+    call_in_session,
+    get_async_database_engine,
+    get_database_engine,
+    run_sync_section,
+)
+from .outbound import Outbound
+from .pipeline import (
+    DEFAULT_STAGES,
+    Invocation,
+    Middleware,
+    Pipeline,
+    current_invocation,
+)
+from .router import Router
+from .throttle import Throttle
+from .worker import WorkerPool
 
 SPACE_RE = re.compile('\s+')
 
+logger = logging.getLogger(__name__)
+
 
 class Bot:
     """Strea"""
@@ -26,104 +55,97 @@ class Bot:
         config: AttrDict,
         orm_base=None,
         using_box: Box=None,
+        client: Client=None,
+        shard_id: int=None,
+        shard_count: int=None,
     ) -> None:
         config.DATABASE_ENGINE = get_database_engine(config)
+        self.async_engine = None
+        if config.DATABASE_ASYNC_URL:
+            self.async_engine = get_async_database_engine(config)
+            config.DATABASE_ASYNC_ENGINE = self.async_engine
 
-        self.client = Client()
+        if client is None:
+            if shard_count is None:
+                client = Client()
+            else:
+                client = Client(shard_id=shard_id, shard_count=shard_count)
+        self.client = client
+        self.shard_id = shard_id
         self.config = config
         self.orm_base = orm_base or Base
         self.box = using_box or box
+        workers = config.DATABASE_WORKERS
+        if isinstance(config.DATABASE_ENGINE.pool, StaticPool):
+            # Every thread shares one connection of in-memory database.
+            workers = 1
+        self.executor = Executor(workers)
 
         self.event = self.client.event
+        self.outbound = Outbound(
+            self.client,
+            rate=config.OUTBOUND_RATE,
+            per=config.OUTBOUND_PER,
+        )
 
-        for module_name in config.HANDLERS:
-            importlib.import_module(module_name)
+        lazy: Dict[str, str] = {}
+        if config.HANDLER_MANIFEST:
+            lazy = manifest.prepare(
+                pathlib.Path(config.HANDLER_MANIFEST),
+                config.HANDLERS,
+                self.box,
+            )
+        else:
+            for module_name in config.HANDLERS:
+                importlib.import_module(module_name)
 
         for module_name in config.MODELS:
             importlib.import_module(module_name)
 
+        self.router = Router(self.box, self.config.PREFIX, lazy)
+        self.pipeline = Pipeline(DEFAULT_STAGES)
+
+        self.workers: Optional[WorkerPool] = None
+        if config.WORKERS:
+            self.workers = WorkerPool(self, config.WORKERS)
+            self.pipeline.add_stage(
+                'remote',
+                self.workers.stage,
+                before='session',
+            )
+
+        self.metrics = Registry()
+        self.setup_metrics()
+
+        self.throttle: Optional[Throttle] = None
+        if config.THROTTLE:
+            self.throttle = Throttle(
+                user_rate=config.THROTTLE_USER_RATE,
+                user_burst=config.THROTTLE_USER_BURST,
+                channel_rate=config.THROTTLE_CHANNEL_RATE,
+                channel_burst=config.THROTTLE_CHANNEL_BURST,
+            )
+
+        @self.client.event
+        async def on_channel_update(before, after):
+            self.on_channel_update(before, after)
+
         @self.client.event
         async def on_message(message: Message):
-            async def process(call: str, args: str, name: str, handler):
-                match = True
-                if handler.is_command:
-                    match = call == self.config.PREFIX + name
-
-                if match:
-                    func_params = handler.signature.parameters
-                    kwargs = {}
-                    options: Dict[str, Any] = {}
-                    arguments: Dict[str, Any] = {}
-                    raw = args
-                    if handler.use_shlex:
-                        try:
-                            option_chunks = shlex.split(raw)
-                        except ValueError:
-                            await self.say(
-                                message.channel,
-                                '*Error*: Can not parse this command'
-                            )
-                            return False
-                    else:
-                        option_chunks = raw.split(' ')
-
-                    try:
-                        options, argument_chunks = handler.parse_options(
-                            option_chunks)
-                    except SyntaxError as e:
-                        await self.say(
-                            message.channel,
-                            '*Error*\n{}'.format(e)
-                        )
-                        return False
-
-                    try:
-                        arguments, remain_chunks = handler.parse_arguments(
-                            argument_chunks
-                        )
-                    except SyntaxError as e:
-                        await self.say(
-                            message.channel,
-                            '*Error*\n{}'.format(e)
-                        )
-                        return False
-                    else:
-                        kwargs.update(options)
-                        kwargs.update(arguments)
-
-                        sess = Session(bind=self.config.DATABASE_ENGINE)
-
-                        if 'bot' in func_params:
-                            kwargs['bot'] = self
-                        if 'message' in func_params:
-                            kwargs['message'] = message
-                        if 'sess' in func_params:
-                            kwargs['sess'] = sess
-                        if 'raw' in func_params:
-                            kwargs['raw'] = raw
-                        if 'remain_chunks' in func_params:
-                            kwargs['remain_chunks'] = remain_chunks
-
-                        validation = True
-                        if handler.channel_validator:
-                            validation = await handler.channel_validator(
-                                self.client,
-                                message
-                            )
-
-                        if validation:
-                            try:
-                                res = await handler.callback(**kwargs)
-                            finally:
-                                sess.close()
-                        else:
-                            sess.close()
-                            return True
-
-                        if not res:
-                            return False
-                return True
-            print(message.content)
+            author = message.author
+            if author.bot or author == self.client.user:
+                return
+
+            started = time.perf_counter()
+            if not message.content.startswith(self.config.PREFIX) and \
+                    not self.router.handlers:
+                if random.random() < self.config.LOG_SAMPLE_RATE:
+                    self.log_message(
+                        MessageContext(message, message.content, ''),
+                        time.perf_counter() - started,
+                    )
+                return
+
             call = ''
             args = ''
             try:
@@ -131,18 +153,186 @@ class Bot:
             except ValueError:
                 call = message.content
 
-            for name, handler in self.box.handlers['message'].items():
-                res = await process(call, args, name, handler)
-                if not res:
-                    break
-            for alias, name in self.box.aliases.items():
-                handler = self.box.handlers['message'][name]
-                res = await process(call, args, alias, handler)
-                if not res:
-                    break
+            ctx = MessageContext(message, call, args)
+            handlers = self.router.handlers
+            ctx.command = self.router.match(call)
+            if ctx.command is not None:
+                if self.throttle is None or self.throttle.consume(
+                    message.author.id,
+                    message.channel.id,
+                    ctx.command.cost,
+                ):
+                    handlers += (ctx.command,)
+                else:
+                    ctx.outcome = 'throttled'
+
+            try:
+                for handler in handlers:
+                    invocation = await self.pipeline.run(
+                        Invocation(self, ctx, handler)
+                    )
+                    if not invocation.propagate:
+                        break
+            except Exception:
+                ctx.outcome = 'exception'
+                raise
+            finally:
+                latency = time.perf_counter() - started
+                if ctx.command is not None:
+                    self.command_latency.labels(ctx.command.name).observe(
+                        latency)
+                    self.command_calls.labels(
+                        ctx.command.name,
+                        ctx.outcome,
+                    ).inc()
+                    self.log_message(ctx, latency)
+                elif random.random() < self.config.LOG_SAMPLE_RATE:
+                    self.log_message(ctx, latency)
+
+    def setup_metrics(self) -> None:
+        """Register metrics and hooks which feed them."""
+
+        registry = self.metrics
+        self.command_calls = registry.counter(
+            'strea_commands',
+            'Count of command invocations',
+            ('command', 'outcome'),
+        )
+        self.command_latency = registry.histogram(
+            'strea_command_latency_seconds',
+            'Latency of command dispatch',
+            ('command',),
+        )
+        stage_latency = registry.histogram(
+            'strea_stage_latency_seconds',
+            'Latency of each dispatch stage',
+            ('command', 'stage'),
+        )
+        sql_statements = registry.counter(
+            'strea_sql_statements',
+            'Count of executed SQL statements',
+        )
+        registry.gauge(
+            'strea_executor_queue_depth',
+            'Count of jobs waiting for executor thread',
+            func=lambda: self.executor.queue_depth,
+        )
+        registry.gauge(
+            'strea_outbound_queue_depth',
+            'Count of queued outbound messages',
+            func=self.outbound.queue_depth,
+        )
+        self.outbound.send_latency = registry.histogram(
+            'strea_send_latency_seconds',
+            'Latency of outbound send',
+        )
+
+        engines = [self.config.DATABASE_ENGINE]
+        if self.async_engine:
+            engines.append(self.async_engine.sync_engine)
+        for engine in engines:
+            @listens_for(engine, 'before_cursor_execute')
+            def count_statement(*args):
+                sql_statements.inc()
+
+        @self.middleware
+        async def observe_stages(invocation: Invocation, call_next):
+            try:
+                await call_next()
+            finally:
+                name = invocation.handler.name
+                for stage, elapsed in invocation.timings.items():
+                    stage_latency.labels(name, stage).observe(elapsed)
+
+    def middleware(self, func: Middleware) -> Middleware:
+        """Decorator for add dispatch middleware."""
+
+        return self.pipeline.use(func)
+
+    def on_channel_update(self, before, after) -> None:
+        """Forget validator decisions when channel is renamed."""
+
+        if before.name != after.name:
+            invalidate_channel(after.id)
+
+    def log_message(self, ctx: MessageContext, latency: float) -> None:
+        """Write structured log of processed message."""
+
+        if not logger.isEnabledFor(logging.INFO):
+            return
+
+        message = ctx.message
+        logger.info('message', extra={'fields': {
+            'guild': message.server.id if message.server else None,
+            'channel': message.channel.id,
+            'command': ctx.command.name if ctx.command else None,
+            'latency_ms': round(latency * 1000, 3),
+            'outcome': ctx.outcome,
+        }})
+
+    async def say(
+        self,
+        channel,
+        content: Optional[str]=None,
+        **kwargs
+    ) -> asyncio.Future:
+        """Queue message to given channel.
+
+        It returns future of sent message. Await it to wait delivery.
+
+        """
+
+        invocation = current_invocation.get()
+        if invocation is not None:
+            invocation.record_reply(channel, content, kwargs)
+        return self.outbound.send(channel, content, **kwargs)
+
+    async def run_in_executor(self, func: Callable, *args, **kwargs) -> Any:
+        """Run blocking function like DB section in bounded thread pool."""
+
+        return await self.executor.run(func, *args, **kwargs)
+
+    async def run_in_session(self, func: Callable, *args, **kwargs) -> Any:
+        """Run synchronous DB section with session of current task.
+
+        Session is opened for the section if handler doesn't have one, so
+        callback needs not to take ``sess`` only to get session. With async
+        database backend it runs on event loop without thread, otherwise it
+        runs in bounded thread pool.
+
+        """
 
-    async def say(self, *args, **kwargs):
-        await self.client.send_message(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            if self.async_engine:
+                async with async_session_scope(self.async_engine):
+                    return await run_sync_section(func, *args, **kwargs)
+            return await self.run_in_executor(
+                call_in_session,
+                self.config.DATABASE_ENGINE,
+                func,
+                *args,
+                **kwargs
+            )
+        finally:
+            invocation = current_invocation.get()
+            if invocation is not None:
+                invocation.record('db', time.perf_counter() - started)
 
     def run(self):
-        self.client.run(self.config.TOKEN)
+        listener = setup_logging(self.config)
+        if self.config.METRICS_PORT:
+            self.client.loop.run_until_complete(serve(
+                self.metrics,
+                self.config.METRICS_HOST,
+                self.config.METRICS_PORT,
+            ))
+        if self.workers:
+            self.workers.start(self.client.loop)
+        try:
+            self.client.run(self.config.TOKEN)
+        finally:
+            if self.workers:
+                self.workers.shutdown()
+            self.executor.shutdown()
+            listener.stop()
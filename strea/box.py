@@ -1,16 +1,118 @@
 import collections
 import functools
 import inspect
-from typing import (Any, Awaitable, Callable, Dict, List, Optional, Tuple,
-                    Type, Union)
+from types import MappingProxyType
+from typing import (Any, Awaitable, Callable, Dict, FrozenSet, List, Mapping,
+                    NamedTuple, Optional, Sequence, Tuple, Type, Union)
 
-from discord import Message
+from .cache import ResultCache
+from .command import Argument, Option, Validator, is_legacy_validator
+from .type import compile_converter, is_container
 
-from .command import Argument, Option
-from .type import cast, is_container
 
+__all__ = 'Box', 'Crontab', 'Handler', 'ParsePlan', 'box', 'compile_plan'
 
-__all__ = 'Box', 'Crontab', 'Handler', 'box'
+#: (:class:`tuple` of :class:`str`) Names which :class:`~strea.bot.Bot` can
+#: inject into callback. ``sess`` is handled by ``needs_session``.
+INJECTABLES: Tuple[str, ...] = (
+    'bot',
+    'message',
+    'raw',
+    'remain_chunks',
+)
+
+
+class ParsePlan(NamedTuple):
+    """Compiled, immutable parse plan of handler"""
+
+    options: Tuple[Option, ...]
+    option_map: Mapping[str, Option]
+    required: FrozenSet[str]
+    required_options: Tuple[Option, ...]
+    defaults: Tuple[Tuple[str, Callable[[], Any]], ...]
+    arguments: Tuple[Argument, ...]
+    argument_tails: Tuple[int, ...]
+    injections: Tuple[str, ...]
+    needs_session: bool
+
+
+def resolve_type(param: inspect.Parameter, transform_func) -> Type:
+    """Resolve value type from callback parameter."""
+
+    type_ = param.annotation
+
+    if type_ == inspect._empty:  # type: ignore
+        return str
+    if transform_func:
+        return str
+    return type_
+
+
+def _identity(value):
+    return value
+
+
+def compile_plan(callback, signature: inspect.Signature) -> ParsePlan:
+    """Compile parse plan of given callback."""
+
+    parameters = signature.parameters
+    options: Tuple[Option, ...] = tuple(getattr(callback, '__options__', ()))
+    arguments: Tuple[Argument, ...] = tuple(
+        getattr(callback, '__arguments__', ())
+    )
+
+    option_map: Dict[str, Option] = {}
+    defaults: Dict[str, Callable[[], Any]] = {}
+    required_options: Dict[str, Option] = {}
+
+    for option in options:
+        if option.type_ is None:
+            option.type_ = resolve_type(
+                parameters[option.dest],
+                option.transform_func,
+            )
+        option.convert = compile_converter(option.type_)
+
+        option_map.setdefault(option.name, option)
+
+        if option.multiple:
+            defaults[option.dest] = list
+        elif callable(option.default):
+            defaults[option.dest] = option.default
+        else:
+            defaults[option.dest] = functools.partial(
+                _identity,
+                option.default,
+            )
+
+        if option.required:
+            required_options.setdefault(option.dest, option)
+
+    for argument in arguments:
+        if argument.type_ is None:
+            argument.type_ = resolve_type(
+                parameters[argument.dest],
+                argument.transform_func,
+            )
+            if is_container(argument.type_):
+                argument.container_cls = None
+                argument.typing_has_container = True
+        argument.convert = compile_converter(argument.type_)
+
+    return ParsePlan(
+        options=options,
+        option_map=MappingProxyType(option_map),
+        required=frozenset(required_options),
+        required_options=tuple(required_options.values()),
+        defaults=tuple(defaults.items()),
+        arguments=arguments,
+        argument_tails=tuple(
+            sum(a.nargs for a in arguments[i:])
+            for i in range(len(arguments))
+        ),
+        injections=tuple(x for x in INJECTABLES if x in parameters),
+        needs_session='sess' in parameters,
+    )
 
 
 class Handler:
@@ -20,129 +122,121 @@ class Handler:
         self,
         callback,
         *,
+        name: Optional[str]=None,
         short_help: Optional[str]=None,
         help: Optional[str]=None,
         use_shlex: bool=False,
         is_command: bool=False,
-        channel_validator: Optional[
-            Callable[[Any, Message], Awaitable[bool]]
-        ]=None
+        channel_validator: Optional[Validator]=None,
+        cost: float=1.0,
+        cache: Optional[ResultCache]=None
     ) -> None:
         """Initialize"""
 
         self.callback = callback
+        self.name = name or callback.__name__
         self.short_help = short_help
         self.help = help
         self.is_command = is_command
         self.use_shlex = use_shlex
         self.channel_validator = channel_validator
+        #: (:class:`bool`) Whether :attr:`channel_validator` has old form,
+        #: which :func:`~strea.command.is_legacy_validator` describes
+        self.legacy_validator = channel_validator is not None and \
+            is_legacy_validator(channel_validator)
+        self.cost = cost
+        self.cache = cache
         self.signature = inspect.signature(callback)
+        self.plan = compile_plan(callback, self.signature)
 
-    def parse_options(self, chunk: List[str]) -> Tuple[Dict, List[str]]:
-
-        end = False
-
-        result: Dict[str, Any] = {}
-        options: List[Option] = self.callback.__options__
-
-        for x in options:
-            if x.type_ is None:
-                type_ = self.signature.parameters[x.dest].annotation
-
-                if type_ == inspect._empty:  # type: ignore
-                    type_ = str
-                else:
-                    if x.transform_func:
-                        type_ = str
-
-                x.type_ = type_
-
-        required = {o.dest for o in options if o.required}
+    def parse_options(
+        self,
+        chunk: Sequence[str],
+    ) -> Tuple[Dict, List[str]]:
+
+        plan = self.plan
+        option_map = plan.option_map
+        required = set(plan.required)
+        result: Dict[str, Any] = {
+            dest: factory() for dest, factory in plan.defaults
+        }
+
+        tokens = list(chunk)
+        cursor = 0
+        total = len(tokens)
+
+        while cursor < total:
+            name = tokens[cursor]
+            option = option_map.get(name)
+            if option is None:
+                name, sep, value = name.partition('=')
+                option = option_map.get(name) if sep else None
+                if option is None:
+                    break
+                tokens[cursor] = value
+            else:
+                cursor += 1
 
-        for option in options:
-            if option.multiple:
-                result[option.dest] = []
+            if option.nargs == 0:
+                result[option.dest] = option.value
             else:
-                if callable(option.default):
-                    result[option.dest] = option.default()
-                else:
-                    result[option.dest] = option.default
-
-        while not end and chunk:
-            for option in options:
-                name = chunk.pop(0)
-                if name.startswith(option.name + '='):
-                    name, new_chunk = name.split('=', 1)
-                    chunk.insert(0, new_chunk)
-
-                if name == option.name:
-                    if option.nargs == 0:
-                        result[option.dest] = option.value
+                length = total - cursor
+                if length < option.nargs:
+                    raise SyntaxError(
+                        option.count_error.format(
+                            name=option.name,
+                            expected=option.nargs,
+                            given=length,
+                        )
+                    )
+                args = tokens[cursor:cursor + option.nargs]
+                cursor += option.nargs
+                try:
+                    if option.container_cls:
+                        if option.multiple:
+                            r = option.convert(args)
+                        else:
+                            r = option.container_cls(
+                                option.convert(x) for x in args
+                            )
                     else:
+                        r = option.convert(args[0])
+                except ValueError as e:
+                    raise SyntaxError(
+                        option.type_error.format(name=option.name, e=e)
+                    )
+
+                if option.transform_func:
+                    if option.container_cls:
                         try:
-                            length = len(chunk)
-                            args = [chunk.pop(0) for _ in range(option.nargs)]
-                        except IndexError:
+                            r = option.container_cls(
+                                option.transform_func(x)
+                                for x in r
+                            )
+                        except ValueError as e:
                             raise SyntaxError(
-                                option.count_error.format(
+                                option.transform_error.format(
                                     name=option.name,
-                                    expected=option.nargs,
-                                    given=length,
+                                    e=e,
                                 )
                             )
+                    else:
                         try:
-                            if option.container_cls:
-                                if option.multiple:
-                                    r = cast(option.type_, args)
-                                else:
-                                    r = option.container_cls(
-                                        cast(option.type_, x) for x in args
-                                    )
-                            else:
-                                r = cast(option.type_, args[0])
+                            r = option.transform_func(r)
                         except ValueError as e:
                             raise SyntaxError(
-                                option.type_error.format(name=option.name, e=e)
+                                option.transform_error.format(
+                                    name=option.name,
+                                    e=e,
+                                )
                             )
 
-                        if option.transform_func:
-                            if option.container_cls:
-                                try:
-                                    r = option.container_cls(
-                                        option.transform_func(x)
-                                        for x in r
-                                    )
-                                except ValueError as e:
-                                    raise SyntaxError(
-                                        option.transform_error.format(
-                                            name=option.name,
-                                            e=e,
-                                        )
-                                    )
-                            else:
-                                try:
-                                    r = option.transform_func(r)
-                                except ValueError as e:
-                                    raise SyntaxError(
-                                        option.transform_error.format(
-                                            name=option.name,
-                                            e=e,
-                                        )
-                                    )
-
-                        if option.multiple:
-                            result[option.dest].append(r[0])
-                        else:
-                            result[option.dest] = r
-
-                    if option.dest in required:
-                        required.remove(option.dest)
-
-                    break
+                if option.multiple:
+                    result[option.dest].append(r[0])
+                else:
+                    result[option.dest] = r
 
-                chunk.insert(0, name)
-            else:
-                end = True
+            required.discard(option.dest)
 
         if required:
             raise SyntaxError(
@@ -150,40 +244,28 @@ class Handler:
                     name=o.name,
                     expected=o.nargs,
                     given=0,
-                ) for o in (
-                              list(filter(lambda x: x.dest == o, options))[0]
-                              for o in required
-                          ))
+                ) for o in plan.required_options if o.dest in required)
             )
 
-        return result, chunk
+        return result, tokens[cursor:]
 
-    def parse_arguments(self, chunk: List[str]) -> Tuple[Dict, List[str]]:
+    def parse_arguments(
+        self,
+        chunk: Sequence[str],
+    ) -> Tuple[Dict, List[str]]:
 
         result: Dict[str, Any] = {}
 
-        arguments: List[Argument] = self.callback.__arguments__
-
-        for x in arguments:
-            if x.type_ is None:
-                type_ = self.signature.parameters[x.dest].annotation
-
-                if type_ == inspect._empty:  # type: ignore
-                    type_ = str
-                else:
-                    if x.transform_func:
-                        type_ = str
+        plan = self.plan
+        cursor = 0
+        total = len(chunk)
 
-                x.type_ = type_
-                if is_container(x.type_):
-                    x.container_cls = None
-                    x.typing_has_container = True
-
-        for i, argument in enumerate(arguments):
+        for argument, tail in zip(plan.arguments, plan.argument_tails):
             r = None
+            remain = total - cursor
             length = argument.nargs
             if argument.nargs < 0:
-                length = len(chunk) - sum(a.nargs for a in arguments[i:]) - 1
+                length = remain - tail - 1
 
             if length < 1:
                 raise SyntaxError(argument.count_error.format(
@@ -191,25 +273,26 @@ class Handler:
                     expected='>0',
                     given=0,
                 ))
-            if length <= len(chunk):
-                args = [chunk.pop(0) for _ in range(length)]
+            if length <= remain:
+                args = chunk[cursor:cursor + length]
+                cursor += length
             else:
                 raise SyntaxError(argument.count_error.format(
                     name=argument.name,
                     expected=argument.nargs,
-                    given=len(chunk),
+                    given=remain,
                 ))
             try:
                 if argument.concat:
                     r = ' '.join(args)
                 elif argument.container_cls:
                     r = argument.container_cls(
-                        cast(argument.type_, x) for x in args
+                        argument.convert(x) for x in args
                     )
                 elif argument.typing_has_container:
-                    r = cast(argument.type_, args)
+                    r = argument.convert(args)
                 else:
-                    r = cast(argument.type_, args[0])
+                    r = argument.convert(args[0])
             except ValueError as e:
                 raise SyntaxError(
                     argument.type_error.format(
@@ -242,7 +325,7 @@ class Handler:
             if r is not None:
                 result[argument.dest] = r
 
-        return result, chunk
+        return result, list(chunk[cursor:])
 
 
 class Box:
@@ -265,11 +348,17 @@ class Box:
         short_help: Optional[str]=None,
         help: Optional[str]=None,
         use_shlex: bool=True,
-        channels: Optional[
-            Callable[[Any, Message], Awaitable[bool]]
-        ]=None
+        channels: Optional[Validator]=None,
+        cost: float=1.0,
+        cache: Optional[ResultCache]=None
     ):
-        """Shortcut decorator for make command easily."""
+        """Shortcut decorator for make command easily.
+
+        ``cost`` is count of throttle tokens which one call spends.
+        ``cache`` memoizes replies by parsed arguments. Use it only for
+        command whose replies depend only on arguments and cached data.
+
+        """
 
         def decorator(func):
             _short_help = short_help
@@ -295,11 +384,14 @@ class Box:
             def internal(func_):
                 self.handlers['message'][name] = Handler(
                     func_,
+                    name=name,
                     short_help=_short_help,
                     help=help_message,
                     is_command=True,
                     use_shlex=use_shlex,
                     channel_validator=channels,
+                    cost=cost,
+                    cache=cache,
                 )
 
                 if aliases is not None:
@@ -316,9 +408,7 @@ class Box:
         self,
         type_: Union[str],
         *,
-        channels: Optional[
-            Callable[[Any, Message], Awaitable[bool]]
-        ]=None
+        channels: Optional[Validator]=None
     ):
         """Decorator for make handler."""
 
@@ -0,0 +1,125 @@
+""":mod:`strea.cache` --- reply cache of idempotent commands
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Memoize replies of command whose output depends only on its arguments and
+rarely changed data. Entry expires after TTL, least recently used entry is
+evicted when cache is full, and caches can be cleared by tag when data is
+changed.
+
+"""
+
+import collections
+import time
+import weakref
+from typing import Any, Callable, Hashable, Iterable, Optional, Tuple
+
+__all__ = 'CACHES', 'ResultCache', 'invalidate', 'make_key'
+
+
+class ResultCache:
+    """TTL and LRU cache
+
+    Data can be changed by other process, which can not clear caches by tag,
+    so reply cache can be given ``stamp``, synchronous function which
+    summarizes data like :func:`~strea.handlers.saomd.get_scout_catalog_stamp`.
+    Dispatcher runs it with :meth:`~strea.bot.Bot.run_in_session` and puts
+    its result in key, so replies made from older data are not served.
+
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float=300.0,
+        maxsize: int=256,
+        tags: Iterable[str]=(),
+        stamp: Optional[Callable[[], Hashable]]=None
+    ) -> None:
+        """Initialize"""
+
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.tags = frozenset(tags)
+        self.stamp = stamp
+        self.entries: 'collections.OrderedDict[Hashable, Tuple[float, Any]]' \
+            = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        CACHES.add(self)
+
+    def get(self, key: Hashable, now: Optional[float]=None) -> Any:
+        """Get cached value.
+
+        :raise KeyError: when there is no live entry of given key
+
+        """
+
+        if now is None:
+            now = time.monotonic()
+        try:
+            expires, value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        if expires <= now:
+            del self.entries[key]
+            self.misses += 1
+            raise KeyError(key)
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, now: Optional[float]=None):
+        """Store value and evict least recently used one when full."""
+
+        if now is None:
+            now = time.monotonic()
+        self.entries[key] = now + self.ttl, value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        """Remove entry of given key if there is."""
+
+        self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+#: (:class:`weakref.WeakSet`) Every living cache, and anything else which
+#: has ``tags`` and ``clear()`` like :class:`~strea.search.TitleIndex`
+CACHES: 'weakref.WeakSet[ResultCache]' = weakref.WeakSet()
+
+
+def invalidate(tag: Optional[str]=None) -> None:
+    """Clear caches which have given tag, or every cache."""
+
+    for cache in list(CACHES):
+        if tag is None or tag in cache.tags:
+            cache.clear()
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    hash(value)
+    return value
+
+
+def make_key(name: str, *values: Any) -> Optional[Hashable]:
+    """Make key from command name and parsed values.
+
+    :const:`None` means values can not be key.
+
+    """
+
+    try:
+        return (name,) + tuple(_freeze(v) for v in values)
+    except TypeError:
+        return None
@@ -1,3 +1,4 @@
+import asyncio
 import functools
 import os.path
 import pathlib
@@ -9,9 +10,13 @@ from alembic.config import Config as AlembicConfig
 import click
 
 
-from .bot import Bot, Session
+from . import manifest
+from .bench import BENCHMARKS
+from .bot import Bot
+from .box import box
 from .config import load
-from .saomd import MigrationStatus, ScoutMigration
+from .orm import Session
+from .shard import Supervisor
 
 
 __all__ = 'error', 'load_config', 'main', 'strea'
@@ -60,12 +65,19 @@ def strea():
 
 
 @strea.command()
+@click.option('--shards', type=int, default=None)
 @load_config
-def run(config):
+def run(config, shards: Optional[int]):
     """Run YUI."""
 
-    bot = Bot(config)
-    bot.run()
+    if shards is None:
+        shards = config.SHARDS
+
+    if shards > 1:
+        Supervisor(config, shards).run()
+    else:
+        bot = Bot(config)
+        bot.run()
 
 
 @strea.command()
@@ -371,6 +383,8 @@ def stamp(config, revision: str, sql: bool, tag: Optional[str]):
 def create_saomd_scout_data(config):
     """Create SAOMD scout data."""
 
+    from .saomd import MigrationStatus, ScoutMigration
+
     bot = Bot(config)
 
     sess = Session(bind=bot.config.DATABASE_ENGINE)
@@ -388,4 +402,112 @@ def create_saomd_scout_data(config):
     click.echo('처리 완료')
 
 
+@strea.command('build-manifest')
+@load_config
+def build_manifest(config):
+    """Build command manifest of handler modules."""
+
+    if not config.HANDLER_MANIFEST:
+        error('HANDLER_MANIFEST is not set.')
+
+    path = pathlib.Path(config.HANDLER_MANIFEST)
+    result = manifest.build(config.HANDLERS, box)
+    manifest.save(path, result)
+    for module_name, entry in result['modules'].items():
+        mode = 'eager' if entry['eager'] else 'lazy'
+        click.echo(f'{module_name} ({mode}): {len(entry["commands"])}')
+
+
+@strea.command('replay')
+@click.option('--file', '-f', 'path', type=click.Path(exists=True))
+@click.option('--count', '-n', default=10000)
+@click.option('--concurrency', default=1)
+@click.option('--users', default=100)
+@click.option('--throttle', is_flag=True, default=False)
+@load_config
+def replay_messages(
+    config,
+    path: Optional[str],
+    count: int,
+    concurrency: int,
+    users: int,
+    throttle: bool,
+):
+    """Replay messages against in-memory database and report latency."""
+
+    from .replay import (load_records, make_bot, prepare_database, replay,
+                         synthetic_records)
+
+    bot, client = make_bot(config, THROTTLE=throttle)
+    prepare_database(bot)
+
+    if path:
+        records = load_records(pathlib.Path(path))
+    else:
+        records = synthetic_records(count, config.PREFIX, users=users)
+
+    report = asyncio.get_event_loop().run_until_complete(
+        replay(bot, client, records, concurrency=concurrency)
+    )
+    click.echo(report.format())
+
+
+@strea.command('loadtest')
+@click.option('--users', '-u', default=1000)
+@click.option('--requests', '-r', default=5)
+@click.option('--think', default=1.0)
+@click.option('--ramp', default=0.0)
+@click.option('--throttle', is_flag=True, default=False)
+@load_config
+def load_test(
+    config,
+    users: int,
+    requests: int,
+    think: float,
+    ramp: float,
+    throttle: bool,
+):
+    """Simulate many users pulling scouts against configured database."""
+
+    from .loadtest import run_load
+    from .replay import make_bot, prepare_database
+    from .saomd import ScoutMigration
+
+    if not config.DATABASE_URL:
+        error('DATABASE_URL is not set.')
+
+    bot, client = make_bot(
+        config,
+        DATABASE_URL=config.DATABASE_URL,
+        DATABASE_ASYNC_URL=config.DATABASE_ASYNC_URL,
+        THROTTLE=throttle,
+    )
+    prepare_database(bot)
+    titles = sorted({cls.title for cls in ScoutMigration.__subclasses__()})
+
+    report = asyncio.get_event_loop().run_until_complete(run_load(
+        bot,
+        client,
+        titles,
+        users=users,
+        requests=requests,
+        think=think,
+        ramp=ramp,
+    ))
+    click.echo(report.format())
+
+
+@strea.command()
+@click.argument('name', type=click.Choice(sorted(BENCHMARKS)))
+@click.option('--number', '-n', type=int, default=None)
+def bench(name: str, number: Optional[int]):
+    """Run micro benchmark."""
+
+    if number is None:
+        number = BENCHMARKS[name].number  # type: ignore
+
+    for label, elapsed in BENCHMARKS[name](number):
+        click.echo(f'{label}: {elapsed / number * 1e6:.3f} usec per loop')
+
+
 main = strea
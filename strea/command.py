@@ -5,84 +5,145 @@ Decorators and classes for making command.
 
 """
 
+import asyncio
 import functools
-from typing import Any, Awaitable, Callable, List, Optional, Type, Union
+import weakref
+from typing import (Any, Awaitable, Callable, Dict, FrozenSet, List,
+                    Optional, Tuple, Type, Union)
 
 from discord import Message
 
-__all__ = 'Argument', 'DM', 'Option', 'argument', 'not_', 'only', 'option'
+__all__ = (
+    'Argument',
+    'ChannelValidator',
+    'Option',
+    'PM',
+    'Validator',
+    'argument',
+    'invalidate_channel',
+    'is_legacy_validator',
+    'not_',
+    'only',
+    'option',
+)
 
 
 class PM:
     """Private Message"""
 
 
-def only(*channels: Union[Type[PM], str], error: Optional[str]=None) \
-        -> Callable[[Any, Message], Awaitable[bool]]:
-    """Mark channel to allow to use handler."""
+class ChannelValidator:
+    """Channel validator compiled from channel names
+
+    Decisions are memoized per channel id. Call :func:`invalidate_channel`
+    when a channel is renamed.
+
+    """
 
-    allow_pm = False
-    if PM in channels:
-        channels = tuple(x for x in channels if x is not PM)
-        allow_pm = True
-
-    async def callback(client, message: Message) -> bool:
-        if message.channel.is_private:
-            if allow_pm:
-                return True
-            else:
-                if error:
-                    await client.send_message(
-                        message.channel,
-                        error
-                    )
-                return False
+    #: (:class:`int`) Count of memoized decisions to keep
+    max_decisions = 10000
+
+    def __init__(
+        self,
+        channels: Tuple[Union[Type[PM], str], ...],
+        *,
+        allow: bool,
+        error: Optional[str]=None
+    ) -> None:
+        """Initialize"""
+
+        self.pm = PM in channels
+        self.names: FrozenSet[str] = frozenset(
+            x for x in channels if x is not PM
+        )
+        self.allow = allow
+        self.error = error
+        self.decisions: Dict[Any, bool] = {}
+        VALIDATORS.add(self)
+
+    def decide(self, channel) -> bool:
+        """Decide whether handler can be used in given channel."""
+
+        try:
+            return self.decisions[channel.id]
+        except KeyError:
+            pass
+
+        if channel.is_private:
+            listed = self.pm
+        else:
+            listed = channel.name in self.names
+
+        decision = listed == self.allow
+        if len(self.decisions) >= self.max_decisions:
+            self.decisions.clear()
+        self.decisions[channel.id] = decision
+        return decision
+
+    def invalidate(self, channel_id=None) -> None:
+        """Forget memoized decision of given channel, or all of them."""
+
+        if channel_id is None:
+            self.decisions.clear()
         else:
-            if message.channel.name in channels:
-                return True
-            else:
-                if error:
-                    await client.send_message(
-                        message.channel,
-                        error
-                    )
-                return False
+            self.decisions.pop(channel_id, None)
+
+    def __call__(self, message: Message) -> Tuple[bool, Optional[str]]:
+        """Decide about channel of message, with error to reply if denied.
+
+        Caller sends error through outbound queue like other replies.
+
+        """
+
+        if self.decide(message.channel):
+            return True, None
+        return False, self.error
 
-    return callback
+
+#: Type of channel validator of new form or old form
+Validator = Union[
+    Callable[[Message], Tuple[bool, Optional[str]]],
+    Callable[[Any, Message], Awaitable[bool]],
+]
+
+
+def is_legacy_validator(validator: Validator) -> bool:
+    """Check given channel validator has old form, coroutine function which
+    takes client and message, sends error by itself and returns
+    :class:`bool`.
+
+    Validators of new form like :class:`ChannelValidator` are synchronous,
+    take message and return whether it is allowed with error to reply.
+
+    """
+
+    return asyncio.iscoroutinefunction(validator) or \
+        asyncio.iscoroutinefunction(getattr(validator, '__call__', None))
+
+
+#: (:class:`weakref.WeakSet`) Every living :class:`ChannelValidator`
+VALIDATORS: 'weakref.WeakSet[ChannelValidator]' = weakref.WeakSet()
+
+
+def invalidate_channel(channel_id=None) -> None:
+    """Forget memoized decisions about given channel in every validator."""
+
+    for validator in list(VALIDATORS):
+        validator.invalidate(channel_id)
+
+
+def only(*channels: Union[Type[PM], str], error: Optional[str]=None) \
+        -> ChannelValidator:
+    """Mark channel to allow to use handler."""
+
+    return ChannelValidator(channels, allow=True, error=error)
 
 
 def not_(*channels: Union[Type[PM], str], error: Optional[str]=None) \
-        -> Callable[[Any, Message], Awaitable[bool]]:
+        -> ChannelValidator:
     """Mark channel to deny to use handler."""
 
-    deny_pm = False
-    if PM in channels:
-        channels = tuple(x for x in channels if x is not PM)
-        deny_pm = True
-
-    async def callback(client, message: Message) -> bool:
-        if message.channel.is_private:
-            if deny_pm:
-                if error:
-                    await client.say(
-                        message.channel,
-                        error
-                    )
-                return False
-            else:
-                return True
-        else:
-            if message.channel.name in channels:
-                if error:
-                    await client.say(
-                        message.channel,
-                        error
-                    )
-                return False
-            else:
-                return True
-
-    return callback
+    return ChannelValidator(channels, allow=False, error=error)
 
 
 def argument(
@@ -352,6 +413,8 @@ class Argument:
         self.nargs = nargs
         self.transform_func = transform_func
         self.type_ = type_
+        #: Converter of ``type_`` which :func:`~strea.box.compile_plan` sets
+        self.convert: Optional[Callable[[Any], Any]] = None
         self.container_cls = container_cls
         self.typing_has_container = False
         self.concat = concat
@@ -392,6 +455,8 @@ class Option:
         self.required = required
         self.transform_func = transform_func
         self.type_ = type_
+        #: Converter of ``type_`` which :func:`~strea.box.compile_plan` sets
+        self.convert: Optional[Callable[[Any], Any]] = None
         self.value = value
         self.type_error = type_error
         self.count_error = count_error
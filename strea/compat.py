@@ -0,0 +1,242 @@
+""":mod:`strea.compat` --- compatibility with Python 3.6
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+:mod:`discord` 0.16 runs only on Python 3.6, which lacks :mod:`contextvars`,
+:class:`contextlib.AsyncExitStack` and
+:func:`contextlib.asynccontextmanager`. Standard ones are used when they
+exist, otherwise subsets which strea needs are used. Subsets are kept under
+underscored names on every version so that they can be tested.
+
+Context variable of Python 3.6 belongs to current asyncio task, or to
+current thread outside task, and :meth:`Context.run` runs function in
+given context like :func:`contextvars.copy_context` does for thread pool.
+Unlike standard one, new task starts with empty context instead of copy of
+context of its creator.
+
+"""
+
+import asyncio
+import functools
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Tuple
+
+__all__ = (
+    'AsyncExitStack',
+    'Context',
+    'ContextVar',
+    'asynccontextmanager',
+    'copy_context',
+)
+
+
+_MISSING = object()
+_local = threading.local()
+_task_contexts: 'weakref.WeakKeyDictionary[asyncio.Task, _Context]' = \
+    weakref.WeakKeyDictionary()
+
+try:
+    _current_task = asyncio.current_task
+except AttributeError:
+    _current_task = asyncio.Task.current_task
+
+
+class _Context:
+    """Values of context variables"""
+
+    def __init__(self, values: Dict['_ContextVar', Any]=None) -> None:
+        """Initialize"""
+
+        self.values = dict(values or {})
+
+    def copy(self) -> '_Context':
+        return _Context(self.values)
+
+    def run(self, func: Callable, *args, **kwargs) -> Any:
+        saved = getattr(_local, 'context', None)
+        _local.context = self
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.context = saved
+
+
+def _current_context() -> _Context:
+    context = getattr(_local, 'context', None)
+    if context is not None:
+        return context
+
+    loop = asyncio._get_running_loop()
+    task = _current_task(loop) if loop else None
+    if task is not None:
+        try:
+            return _task_contexts[task]
+        except KeyError:
+            context = _task_contexts[task] = _Context()
+            return context
+
+    try:
+        return _local.default
+    except AttributeError:
+        context = _local.default = _Context()
+        return context
+
+
+def _copy_context() -> _Context:
+    return _current_context().copy()
+
+
+class _Token:
+
+    def __init__(self, var: '_ContextVar', old_value: Any) -> None:
+        """Initialize"""
+
+        self.var = var
+        self.old_value = old_value
+
+
+class _ContextVar:
+    """Variable whose value belongs to current task or thread"""
+
+    def __init__(self, name: str, *, default: Any=_MISSING) -> None:
+        """Initialize"""
+
+        self.name = name
+        self.default = default
+
+    def get(self, default: Any=_MISSING) -> Any:
+        try:
+            return _current_context().values[self]
+        except KeyError:
+            if default is not _MISSING:
+                return default
+            if self.default is not _MISSING:
+                return self.default
+            raise LookupError(self)
+
+    def set(self, value: Any) -> _Token:
+        values = _current_context().values
+        token = _Token(self, values.get(self, _MISSING))
+        values[self] = value
+        return token
+
+    def reset(self, token: _Token) -> None:
+        values = _current_context().values
+        if token.old_value is _MISSING:
+            values.pop(self, None)
+        else:
+            values[self] = token.old_value
+
+
+try:
+    from contextvars import Context, ContextVar, copy_context
+except ImportError:
+    Context, ContextVar, copy_context = (  # type: ignore
+        _Context, _ContextVar, _copy_context
+    )
+
+
+class _AsyncExitStack:
+    """Subset of :class:`contextlib.AsyncExitStack`"""
+
+    def __init__(self) -> None:
+        """Initialize"""
+
+        self.exits: List[Tuple[bool, Callable]] = []
+
+    def push(self, exit: Callable) -> Callable:
+        """Add ``exit(exc_type, exc, tb)`` callback."""
+
+        self.exits.append((False, exit))
+        return exit
+
+    def enter_context(self, cm) -> Any:
+        result = cm.__enter__()
+        self.exits.append((False, cm.__exit__))
+        return result
+
+    async def enter_async_context(self, cm) -> Any:
+        result = await cm.__aenter__()
+        self.exits.append((True, cm.__aexit__))
+        return result
+
+    async def __aenter__(self) -> '_AsyncExitStack':
+        return self
+
+    async def __aexit__(self, *exc_details) -> bool:
+        received = exc_details[0] is not None
+        suppressed = False
+        pending = False
+        while self.exits:
+            is_async, exit = self.exits.pop()
+            try:
+                result = exit(*exc_details)
+                if is_async:
+                    result = await result
+            except BaseException as e:
+                exc_details = type(e), e, e.__traceback__
+                pending = True
+            else:
+                if result:
+                    exc_details = None, None, None
+                    suppressed = True
+                    pending = False
+        if pending:
+            raise exc_details[1]
+        return received and suppressed
+
+
+try:
+    from contextlib import AsyncExitStack
+except ImportError:
+    AsyncExitStack = _AsyncExitStack  # type: ignore
+
+
+class _AsyncGeneratorContextManager:
+
+    def __init__(self, func: Callable, args, kwargs) -> None:
+        """Initialize"""
+
+        self.gen = func(*args, **kwargs)
+
+    async def __aenter__(self) -> Any:
+        try:
+            return await self.gen.__anext__()
+        except StopAsyncIteration:
+            raise RuntimeError("generator didn't yield") from None
+
+    async def __aexit__(self, type_, value, traceback) -> bool:
+        if type_ is None:
+            try:
+                await self.gen.__anext__()
+            except StopAsyncIteration:
+                return False
+            raise RuntimeError("generator didn't stop")
+
+        if value is None:
+            value = type_()
+        try:
+            await self.gen.athrow(type_, value, traceback)
+        except StopAsyncIteration as e:
+            return e is not value
+        except BaseException as e:
+            if e is value:
+                return False
+            raise
+        raise RuntimeError("generator didn't stop after athrow()")
+
+
+def _asynccontextmanager(func: Callable) -> Callable:
+    """Subset of :func:`contextlib.asynccontextmanager`"""
+
+    @functools.wraps(func)
+    def helper(*args, **kwargs):
+        return _AsyncGeneratorContextManager(func, args, kwargs)
+
+    return helper
+
+
+try:
+    from contextlib import asynccontextmanager
+except ImportError:
+    asynccontextmanager = _asynccontextmanager  # type: ignore
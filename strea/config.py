@@ -13,9 +13,25 @@ DEFAULT = {
     'DEBUG': False,
     'PREFIX': '',
     'HANDLERS': (),
+    'HANDLER_MANIFEST': '',
+    'LOG_LEVEL': 'INFO',
+    'LOG_SAMPLE_RATE': 0.01,
     'DATABASE_URL': '',
+    'DATABASE_ASYNC_URL': '',
     'DATABASE_ECHO': False,
+    'DATABASE_WORKERS': 4,
+    'METRICS_HOST': '127.0.0.1',
+    'METRICS_PORT': 0,
     'MODELS': (),
+    'OUTBOUND_RATE': 5,
+    'OUTBOUND_PER': 5.0,
+    'SHARDS': 1,
+    'THROTTLE': False,
+    'THROTTLE_USER_RATE': 0.5,
+    'THROTTLE_USER_BURST': 10,
+    'THROTTLE_CHANNEL_RATE': 2.0,
+    'THROTTLE_CHANNEL_BURST': 30,
+    'WORKERS': 0,
 }
 
 
@@ -0,0 +1,53 @@
+""":mod:`strea.context` --- per-message context
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+State shared by every handler which process same message.
+
+"""
+
+import shlex
+from typing import Dict, Optional, Tuple
+
+from discord import Message
+
+from .box import Handler
+
+__all__ = 'MessageContext',
+
+
+class MessageContext:
+    """Context of one incoming message"""
+
+    def __init__(self, message: Message, call: str, args: str) -> None:
+        """Initialize"""
+
+        self.message = message
+        self.call = call
+        self.args = args
+        self.command: Optional[Handler] = None
+        self.outcome = 'ignored'
+        self._tokens: Dict[bool, Optional[Tuple[str, ...]]] = {}
+
+    def tokenize(self, use_shlex: bool) -> Tuple[str, ...]:
+        """Split args into tokens only once per tokenizer mode.
+
+        :raise ValueError: when shlex can not parse args
+
+        """
+
+        try:
+            tokens = self._tokens[use_shlex]
+        except KeyError:
+            if use_shlex:
+                try:
+                    tokens = tuple(shlex.split(self.args))
+                except ValueError:
+                    tokens = None
+            else:
+                tokens = tuple(self.args.split(' '))
+            self._tokens[use_shlex] = tokens
+
+        if tokens is None:
+            raise ValueError('Can not parse this command')
+
+        return tokens
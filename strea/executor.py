@@ -0,0 +1,101 @@
+""":mod:`strea.executor` --- bounded thread pool for blocking work
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Run blocking code such as synchronous SQLAlchemy queries outside of the
+event loop.
+
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from .compat import copy_context
+
+__all__ = 'Executor',
+
+
+class Executor:
+    """Bounded thread pool which keeps queue depth metrics"""
+
+    def __init__(self, max_workers: int) -> None:
+        """Initialize"""
+
+        self.max_workers = max_workers
+        self.pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='strea-executor',
+        )
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.max_pending = 0
+        #: (:class:`float`) Total seconds which jobs waited for worker
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run given function in pool with context of current task."""
+
+        context = copy_context()
+
+        with self._lock:
+            self.pending += 1
+            self.max_pending = max(self.max_pending, self.pending)
+
+        future = self.pool.submit(
+            self._call,
+            functools.partial(context.run, func, *args, **kwargs),
+            time.perf_counter(),
+        )
+        future.add_done_callback(self._done)
+
+        return await asyncio.wrap_future(future)
+
+    def _call(self, func: Callable, submitted: float) -> Any:
+        waited = time.perf_counter() - submitted
+        with self._lock:
+            self.pending -= 1
+            self.running += 1
+            self.wait_time += waited
+            self.max_wait = max(self.max_wait, waited)
+        try:
+            return func()
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    def _done(self, future: concurrent.futures.Future) -> None:
+        if future.cancelled():
+            with self._lock:
+                self.pending -= 1
+
+    @property
+    def queue_depth(self) -> int:
+        """Count of jobs which wait for free worker."""
+
+        return self.pending
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of pool metrics."""
+
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'pending': self.pending,
+                'running': self.running,
+                'completed': self.completed,
+                'max_pending': self.max_pending,
+                'wait_time': self.wait_time,
+                'max_wait': self.max_wait,
+            }
+
+    def shutdown(self, wait: bool=True) -> None:
+        """Stop all workers."""
+
+        self.pool.shutdown(wait=wait)
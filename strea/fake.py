@@ -0,0 +1,162 @@
+""":mod:`strea.fake` --- fake Discord objects
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Stand-ins of :mod:`discord` client and models which are enough to run
+:class:`~strea.bot.Bot` without Discord, for replay and load test.
+
+"""
+
+import asyncio
+import collections
+import itertools
+from typing import Any, Callable, Deque, Dict, Optional
+
+__all__ = (
+    'FakeChannel',
+    'FakeClient',
+    'FakeMessage',
+    'FakeServer',
+    'FakeUser',
+)
+
+_ids = itertools.count(1)
+
+
+def _next_id() -> str:
+    return str(next(_ids))
+
+
+class FakeUser:
+    """Fake :class:`discord.User`"""
+
+    def __init__(
+        self,
+        id: Optional[str]=None,
+        name: str='user',
+        bot: bool=False
+    ) -> None:
+        """Initialize"""
+
+        self.id = id or _next_id()
+        self.name = name
+        self.bot = bot
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, FakeUser) and self.id == other.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+
+class FakeServer:
+    """Fake :class:`discord.Server`"""
+
+    def __init__(self, id: Optional[str]=None, name: str='server') -> None:
+        """Initialize"""
+
+        self.id = id or _next_id()
+        self.name = name
+
+
+class FakeChannel:
+    """Fake :class:`discord.Channel`"""
+
+    def __init__(
+        self,
+        id: Optional[str]=None,
+        name: Optional[str]='general',
+        server: Optional[FakeServer]=None,
+        is_private: bool=False
+    ) -> None:
+        """Initialize"""
+
+        self.id = id or _next_id()
+        self.name = name
+        self.server = server
+        self.is_private = is_private
+
+
+class FakeMessage:
+    """Fake :class:`discord.Message`"""
+
+    def __init__(
+        self,
+        content: str,
+        channel: FakeChannel,
+        author: FakeUser,
+        id: Optional[str]=None
+    ) -> None:
+        """Initialize"""
+
+        self.id = id or _next_id()
+        self.content = content
+        self.channel = channel
+        self.author = author
+        self.server = channel.server
+
+
+class FakeClient:
+    """Fake :class:`discord.Client` which keeps sent messages in memory"""
+
+    def __init__(
+        self,
+        *,
+        latency: float=0.0,
+        keep: int=1000,
+        **options
+    ) -> None:
+        """Initialize"""
+
+        self.options = options
+        self.latency = latency
+        #: Id of bot never collides with author ids of records, which are
+        #: usually plain numbers
+        self.user = FakeUser(id=f'bot-{_next_id()}', name='strea', bot=True)
+        self.channels: Dict[str, FakeChannel] = {}
+        #: (:class:`collections.deque`) Last sent messages
+        self.sent: Deque[FakeMessage] = collections.deque(maxlen=keep)
+        self.sent_count = 0
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return asyncio.get_event_loop()
+
+    def event(self, coro: Callable) -> Callable:
+        """Register event handler like :meth:`discord.Client.event`."""
+
+        setattr(self, coro.__name__, coro)
+        return coro
+
+    def get_channel(self, id: str) -> Optional[FakeChannel]:
+        return self.channels.get(id)
+
+    def channel(self, name: str, **kwargs) -> FakeChannel:
+        """Get or make channel of given name."""
+
+        for channel in self.channels.values():
+            if channel.name == name:
+                return channel
+        channel = FakeChannel(name=name, **kwargs)
+        self.channels[channel.id] = channel
+        return channel
+
+    async def send_message(
+        self,
+        destination: FakeChannel,
+        content: Optional[str]=None,
+        **kwargs: Any
+    ) -> FakeMessage:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        message = FakeMessage(content or '', destination, self.user)
+        self.sent.append(message)
+        self.sent_count += 1
+        return message
+
+    async def dispatch(self, message: FakeMessage) -> None:
+        """Deliver incoming message to ``on_message`` handler."""
+
+        await self.on_message(message)  # type: ignore
+
+    def run(self, *args) -> None:
+        raise RuntimeError('FakeClient can not connect to Discord')
@@ -1,23 +1,29 @@
 import copy
 import random
-from typing import List, NamedTuple, Optional, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 
 from discord import Message
 
 from sqlalchemy.orm.exc import NoResultFound
+from sqlalchemy.sql.expression import func
 
 from ..box import box
+from ..cache import ResultCache
 from ..command import PM, argument, only
 from ..models.saomd import (
     COST_TYPE_LABEL,
     CostType,
     Player,
     PlayerScout,
+    SCOUT_CACHE_TAG,
+    SCOUT_TYPE_LABEL,
     Scout,
     ScoutType,
     Step,
 )
-from ..util import bold, fuzzy_korean_ratio, strike
+from ..orm import get_session, transaction
+from ..search import ChoseongIndex, TitleIndex, is_choseong
+from ..util import bold, strike
 
 THREE_STAR_CHARACTERS: List[str] = [
     '[검은 스프리건] 키리토',
@@ -144,35 +150,126 @@ class Weapon(NamedTuple):
     battle_skills: Optional[List[str]]
 
 
-def get_or_create_player(sess, user) -> Player:
+def get_or_create_player(user: str, sess=None) -> Player:
+    if sess is None:
+        sess = get_session()
+
     try:
         player = sess.query(Player).filter_by(user=user).one()
     except NoResultFound:
         player = Player()
         player.user = user
-        with sess.begin():
+        with transaction(sess):
             sess.add(player)
     return player
 
 
-def get_similar_scout_by_title(sess, type: ScoutType, title: str) -> Scout:
-    scouts = sess.query(Scout).filter_by(type=type).all()
+SCOUT_TITLE_INDEXES: Dict[ScoutType, TitleIndex] = {
+    type: TitleIndex(tags={SCOUT_CACHE_TAG}) for type in ScoutType
+}
 
-    scout = scouts[0]
-    ratio = fuzzy_korean_ratio(scout.title, title)
-    for s in scouts[1:]:
-        _ratio = fuzzy_korean_ratio(s.title, title)
-        if ratio < _ratio:
-            ratio = _ratio
-            scout = s
-    return scout
+SCOUT_CHOSEONG_INDEXES: Dict[ScoutType, ChoseongIndex] = {
+    type: ChoseongIndex(tags={SCOUT_CACHE_TAG}) for type in ScoutType
+}
 
 
-def get_or_create_player_scout(
+#: (:class:`~strea.cache.ResultCache`) Stamps of scout catalog. Patch in
+#: this process clears them, and patch by other process is noticed after TTL.
+SCOUT_CATALOG_STAMPS = ResultCache(
+    ttl=5.0,
+    maxsize=len(ScoutType),
+    tags=[SCOUT_CACHE_TAG],
+)
+
+
+def get_scout_catalog_stamp(type: ScoutType, sess) -> Tuple:
+    """Summarize scouts of given type to find out stale index.
+
+    Scouts are patched by other process, and version bump recreates scout
+    with new id. Summary is cached for a few seconds, so burst of lookups
+    runs aggregate query once.
+
+    """
+
+    try:
+        return SCOUT_CATALOG_STAMPS.get(type)
+    except KeyError:
+        pass
+    stamp = tuple(sess.query(
+        func.count(Scout.id),
+        func.max(Scout.id),
+        func.max(Scout.version),
+    ).filter_by(type=type).one())
+    SCOUT_CATALOG_STAMPS.set(type, stamp)
+    return stamp
+
+
+def find_scout_in_index(
+    index: Union[ChoseongIndex, TitleIndex],
+    type: ScoutType,
+    query: str,
     sess,
+) -> Optional[Scout]:
+    """Find scout of given type which matches query best in given index.
+
+    Index is rebuilt when it is older than scouts, or when its best match
+    was deleted in the meantime. Cached stamp is dropped in the latter
+    case, because it must have been older than scouts too.
+
+    """
+
+    for retry in (False, True):
+        if retry:
+            SCOUT_CATALOG_STAMPS.discard(type)
+        stamp = get_scout_catalog_stamp(type, sess)
+        if retry or index.stamp != stamp:
+            index.build(
+                sess.query(Scout.id, Scout.title)
+                .filter_by(type=type)
+                .order_by(Scout.id)
+                .all(),
+                stamp=stamp,
+            )
+        id = index.best(query)
+        if id is None:
+            return None
+        scout = sess.query(Scout).get(id)
+        if scout is not None:
+            return scout
+    return None
+
+
+def get_similar_scout_by_title(
+    type: ScoutType,
+    title: str,
+    sess=None,
+) -> Optional[Scout]:
+    """Find scout whose title is most similar to given one.
+
+    Title typed only in initial consonants matches scout whose title has
+    them in order, and finds nothing rather than dissimilar one when no
+    title has them.
+
+    """
+
+    if sess is None:
+        sess = get_session()
+
+    if is_choseong(title):
+        return find_scout_in_index(
+            SCOUT_CHOSEONG_INDEXES[type], type, title, sess,
+        )
+    return find_scout_in_index(SCOUT_TITLE_INDEXES[type], type, title, sess)
+
+
+def get_or_create_player_scout(
     player: Player,
-    scout: Scout
+    scout: Scout,
+    sess=None,
 ) -> PlayerScout:
+    if sess is None:
+        sess = get_session()
+
     try:
         player_scout = sess.query(PlayerScout).filter(
             PlayerScout.player == player,
@@ -188,7 +285,7 @@ def get_or_create_player_scout(
         player_scout.scout = scout
         player_scout.next_step = first
 
-        with sess.begin():
+        with transaction(sess):
             sess.add(player_scout)
 
     return player_scout
@@ -348,24 +445,18 @@ def process_step_cost(
     player.record_crystals = record_crystals
 
 
-@box.command('캐릭뽑기', ['캐뽑'], channels=only(
-    'simulation', 'test', PM, error='시뮬레이션 채널에서만 해주세요'
-))
-@argument('title', nargs=-1, concat=True,
-          count_error='스카우트 타이틀을 입력해주세요')
-async def saomd_character_scout(bot, message: Message, sess, title: str):
-    """
-    소드 아트 온라인 메모리 디프래그의 캐릭터 뽑기를 시뮬레이팅합니다.
-
-    `{PREFIX}캐뽑 두근두근` (두근두근 수증기와 미인의 온천 스카우트 11연차를 시뮬레이션)
-
-    지원되는 스카우트 타이틀은 `{PREFIX}캐뽑종류` 로 확인하세요.
+def pull_character_scout(user: str, title: str) -> str:
+    """Pull character scout and make result message."""
 
-    """
+    sess = get_session()
 
-    player = get_or_create_player(sess, message.author.id)
-    scout = get_similar_scout_by_title(sess, ScoutType.character, title)
-    player_scout = get_or_create_player_scout(sess, player, scout)
+    player = get_or_create_player(user)
+    scout = get_similar_scout_by_title(ScoutType.character, title)
+    if scout is None:
+        if is_choseong(title):
+            return f'{title}에 맞는 캐릭터 스카우트가 없어!'
+        return '뽑을 수 있는 캐릭터 스카우트가 없어!'
+    player_scout = get_or_create_player_scout(player, scout)
 
     step: Step = player_scout.next_step
 
@@ -377,49 +468,42 @@ async def saomd_character_scout(bot, message: Message, sess, title: str):
     process_step_cost(player, scout, step, record_crystal)
     player_scout.next_step = step.next_step or step
 
-    with sess.begin():
+    with transaction(sess):
         sess.add(player)
         sess.add(player_scout)
 
-    await bot.say(
-        message.channel,
-        ('{cost_type} {cost}개 써서 {title} {step} {count}{c}차를 해보자!'
-         '\n\n{result}\n\n해방 결정이 {release_crystal}개'
-         '{record_crystal} 생겼어!').format(
-            cost_type=COST_TYPE_LABEL[step.cost_type],
-            cost=step.cost,
-            title=scout.title,
-            step=step.name,
-            count=step.count,
-            c='연' if step.count > 1 else '단',
-            result='\n'.join(results),
-            release_crystal=release_crystal,
-            record_crystal=(
-                f', 기록결정 크리스탈이 {record_crystal}개'
-                if record_crystal > 0 else ''
-            ),
-        )
+    return (
+        '{cost_type} {cost}개 써서 {title} {step} {count}{c}차를 해보자!'
+        '\n\n{result}\n\n해방 결정이 {release_crystal}개'
+        '{record_crystal} 생겼어!'
+    ).format(
+        cost_type=COST_TYPE_LABEL[step.cost_type],
+        cost=step.cost,
+        title=scout.title,
+        step=step.name,
+        count=step.count,
+        c='연' if step.count > 1 else '단',
+        result='\n'.join(results),
+        release_crystal=release_crystal,
+        record_crystal=(
+            f', 기록결정 크리스탈이 {record_crystal}개'
+            if record_crystal > 0 else ''
+        ),
     )
 
 
-@box.command('무기뽑기', ['무뽑'], channels=only(
-    'simulation', 'test', PM, error='시뮬레이션 채널에서만 해주세요'
-))
-@argument('title', nargs=-1, concat=True,
-          count_error='스카우트 타이틀을 입력해주세요')
-async def saomd_weapon_scout(bot, message: Message, sess, title: str):
-    """
-    소드 아트 온라인 메모리 디프래그의 무기 뽑기를 시뮬레이팅합니다.
-
-    `{PREFIX}무뽑 두근두근` (두근두근 수증기와 미인의 온천 스카우트 11연차를 시뮬레이션)
-
-    지원되는 스카우트 타이틀은 `{PREFIX}무뽑종류` 로 확인하세요.
+def pull_weapon_scout(user: str, title: str) -> str:
+    """Pull weapon scout and make result message."""
 
-    """
+    sess = get_session()
 
-    player = get_or_create_player(sess, message.author.id)
-    scout = get_similar_scout_by_title(sess, ScoutType.weapon, title)
-    player_scout = get_or_create_player_scout(sess, player, scout)
+    player = get_or_create_player(user)
+    scout = get_similar_scout_by_title(ScoutType.weapon, title)
+    if scout is None:
+        if is_choseong(title):
+            return f'{title}에 맞는 무기 스카우트가 없어!'
+        return '뽑을 수 있는 무기 스카우트가 없어!'
+    player_scout = get_or_create_player_scout(player, scout)
 
     step: Step = player_scout.next_step
 
@@ -430,48 +514,56 @@ async def saomd_weapon_scout(bot, message: Message, sess, title: str):
     process_step_cost(player, scout, step, record_crystal)
     player_scout.next_step = step.next_step or step
 
-    with sess.begin():
+    with transaction(sess):
         sess.add(player)
         sess.add(player_scout)
 
-    await bot.say(
-        message.channel,
-        ('{cost_type} {cost}개 써서 {title} {step} {count}{c}차를 해보자!'
-         '\n\n{result}\n\n{record_crystal}').format(
-            cost_type=COST_TYPE_LABEL[step.cost_type],
-            cost=step.cost,
-            title=scout.title,
-            step=step.name,
-            count=step.count,
-            c='연' if step.count > 1 else '단',
-            result='\n'.join(results),
-            record_crystal=(
-                f'기록결정 크리스탈이 {record_crystal}개 생겼어!'
-                if record_crystal > 0 else ''
-            ),
-        )
+    return (
+        '{cost_type} {cost}개 써서 {title} {step} {count}{c}차를 해보자!'
+        '\n\n{result}\n\n{record_crystal}'
+    ).format(
+        cost_type=COST_TYPE_LABEL[step.cost_type],
+        cost=step.cost,
+        title=scout.title,
+        step=step.name,
+        count=step.count,
+        c='연' if step.count > 1 else '단',
+        result='\n'.join(results),
+        record_crystal=(
+            f'기록결정 크리스탈이 {record_crystal}개 생겼어!'
+            if record_crystal > 0 else ''
+        ),
     )
 
 
-@box.command('시뮬결과리셋', channels=only(
-    'simulation', 'test', PM, error='시뮬레이션 채널에서만 해주세요'
-))
-async def saomd_sim_result_reset(bot, message: Message, sess):
-    """
-    SAOMD 시뮬 결과 리셋
+def list_scouts(type: ScoutType) -> str:
+    """Make message which lists titles of scouts of given type."""
 
-    `{PREFIX}시뮬결과리셋` (SAOMD 시뮬레이션 결과를 모두 삭제)
+    sess = get_session()
+
+    titles = [
+        title for title, in sess.query(Scout.title).filter_by(
+            type=type,
+        ).order_by(Scout.id)
+    ]
+    if not titles:
+        return f'등록된 {SCOUT_TYPE_LABEL[type]} 스카우트가 없어!'
+
+    return '지원되는 {} 스카우트 목록이야!\n\n{}'.format(
+        SCOUT_TYPE_LABEL[type],
+        '\n'.join(f'- {title}' for title in titles),
+    )
 
-    """
+
+def reset_sim_result(user: str) -> str:
+    """Delete all simulation result of user and make result message."""
+
+    sess = get_session()
 
     try:
-        player = sess.query(Player).filter_by(user=message.author.id).one()
+        player = sess.query(Player).filter_by(user=user).one()
     except NoResultFound:
-        await bot.say(
-            message.channel,
-            '리셋할 데이터가 없어!'
-        )
-        return
+        return '리셋할 데이터가 없어!'
 
     sess.query(PlayerScout).filter_by(player=player).delete()
 
@@ -481,10 +573,120 @@ async def saomd_sim_result_reset(bot, message: Message, sess):
     player.release_crystal = 0
     player.used_diamond = 0
 
-    with sess.begin():
+    with transaction(sess):
         sess.add(player)
 
+    return '리셋했어!'
+
+
+@box.command('캐릭뽑기', ['캐뽑'], cost=2, channels=only(
+    'simulation', 'test', PM, error='시뮬레이션 채널에서만 해주세요'
+))
+@argument('title', nargs=-1, concat=True,
+          count_error='스카우트 타이틀을 입력해주세요')
+async def saomd_character_scout(bot, message: Message, title: str):
+    """
+    소드 아트 온라인 메모리 디프래그의 캐릭터 뽑기를 시뮬레이팅합니다.
+
+    `{PREFIX}캐뽑 두근두근` (두근두근 수증기와 미인의 온천 스카우트 11연차를 시뮬레이션)
+
+    지원되는 스카우트 타이틀은 `{PREFIX}캐뽑종류` 로 확인하세요.
+
+    """
+
+    await bot.say(
+        message.channel,
+        await bot.run_in_session(
+            pull_character_scout,
+            message.author.id,
+            title,
+        ),
+    )
+
+
+@box.command('무기뽑기', ['무뽑'], cost=2, channels=only(
+    'simulation', 'test', PM, error='시뮬레이션 채널에서만 해주세요'
+))
+@argument('title', nargs=-1, concat=True,
+          count_error='스카우트 타이틀을 입력해주세요')
+async def saomd_weapon_scout(bot, message: Message, title: str):
+    """
+    소드 아트 온라인 메모리 디프래그의 무기 뽑기를 시뮬레이팅합니다.
+
+    `{PREFIX}무뽑 두근두근` (두근두근 수증기와 미인의 온천 스카우트 11연차를 시뮬레이션)
+
+    지원되는 스카우트 타이틀은 `{PREFIX}무뽑종류` 로 확인하세요.
+
+    """
+
+    await bot.say(
+        message.channel,
+        await bot.run_in_session(
+            pull_weapon_scout,
+            message.author.id,
+            title,
+        ),
+    )
+
+
+@box.command('시뮬결과리셋', channels=only(
+    'simulation', 'test', PM, error='시뮬레이션 채널에서만 해주세요'
+))
+async def saomd_sim_result_reset(bot, message: Message):
+    """
+    SAOMD 시뮬 결과 리셋
+
+    `{PREFIX}시뮬결과리셋` (SAOMD 시뮬레이션 결과를 모두 삭제)
+
+    """
+
+    await bot.say(
+        message.channel,
+        await bot.run_in_session(reset_sim_result, message.author.id),
+    )
+
+
+def get_scout_catalog_stamps() -> Tuple:
+    """Summarize scouts of every type with session of current task."""
+
+    sess = get_session()
+    return tuple(get_scout_catalog_stamp(type, sess) for type in ScoutType)
+
+
+#: (:class:`~strea.cache.ResultCache`) Reply cache of scout list commands
+SCOUT_LIST_CACHE = ResultCache(
+    ttl=3600.0,
+    maxsize=8,
+    tags=[SCOUT_CACHE_TAG],
+    stamp=get_scout_catalog_stamps,
+)
+
+
+@box.command('캐뽑종류', cache=SCOUT_LIST_CACHE)
+async def saomd_character_scout_list(bot, message: Message):
+    """
+    캐릭터 뽑기 시뮬레이션을 지원하는 스카우트 목록
+
+    `{PREFIX}캐뽑종류` (캐릭터 스카우트 타이틀 목록을 출력)
+
+    """
+
+    await bot.say(
+        message.channel,
+        await bot.run_in_session(list_scouts, ScoutType.character),
+    )
+
+
+@box.command('무뽑종류', cache=SCOUT_LIST_CACHE)
+async def saomd_weapon_scout_list(bot, message: Message):
+    """
+    무기 뽑기 시뮬레이션을 지원하는 스카우트 목록
+
+    `{PREFIX}무뽑종류` (무기 스카우트 타이틀 목록을 출력)
+
+    """
+
     await bot.say(
         message.channel,
-        '리셋했어!'
+        await bot.run_in_session(list_scouts, ScoutType.weapon),
     )
@@ -0,0 +1,180 @@
+""":mod:`strea.loadtest` --- concurrent load generator
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Many simulated users pull SAOMD scouts at the same time through
+:class:`~strea.fake.FakeClient` against configured database, to find out
+throughput, tail latency, lock contention and error rate under spike.
+
+"""
+
+import asyncio
+import collections
+import random
+import time
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.event import listens_for
+
+from .bot import Bot
+from .fake import FakeClient, FakeMessage, FakeUser
+from .replay import Report, percentile
+
+__all__ = 'LoadReport', 'is_lock_error', 'run_load'
+
+#: (:class:`tuple` of :class:`str`) Error messages of lock contention of
+#: SQLite and PostgreSQL
+LOCK_ERRORS: Tuple[str, ...] = (
+    'database is locked',
+    'database table is locked',
+    'deadlock detected',
+    'could not serialize access',
+    'lock timeout',
+    'could not obtain lock',
+)
+
+#: (:class:`tuple`) Command and weight of simulated user
+COMMANDS: Tuple[Tuple[str, float], ...] = (
+    ('캐뽑', 0.45),
+    ('무뽑', 0.45),
+    ('시뮬결과리셋', 0.1),
+)
+
+
+def is_lock_error(error: BaseException) -> bool:
+    """Check given error is caused by lock contention of database."""
+
+    message = str(error).lower()
+    return any(pattern in message for pattern in LOCK_ERRORS)
+
+
+class LoadReport(Report):
+    """Latencies, errors and database contention of load test"""
+
+    def __init__(self) -> None:
+        """Initialize"""
+
+        super(LoadReport, self).__init__()
+        self.error_types: Dict[str, int] = collections.Counter()
+        self.lock_errors = 0
+        self.statements: List[float] = []
+        self.executor: Dict[str, float] = {}
+
+    def fail(self, name: str, latency: float, error: BaseException) -> None:
+        self.add(name, latency, True)
+        self.error_types[type(error).__name__] += 1
+        if is_lock_error(error):
+            self.lock_errors += 1
+
+    def format(self) -> str:
+        count = self.count
+        errors = sum(self.errors.values())
+        lines = [
+            super(LoadReport, self).format(),
+            '',
+            'errors: {} ({:.2%}), lock contention: {}'.format(
+                errors,
+                errors / count if count else 0.0,
+                self.lock_errors,
+            ),
+        ]
+        for name, n in self.error_types.most_common():
+            lines.append(f'  {name}: {n}')
+
+        statements = sorted(self.statements)
+        lines.append(
+            'sql: {} statements, p50 {:.3f} ms, p99 {:.3f} ms, '
+            'max {:.3f} ms'.format(
+                len(statements),
+                percentile(statements, 50) * 1e3,
+                percentile(statements, 99) * 1e3,
+                (statements[-1] if statements else 0.0) * 1e3,
+            )
+        )
+        if self.executor:
+            completed = self.executor['completed']
+            lines.append(
+                'executor: max pending {}, mean wait {:.3f} ms, '
+                'max wait {:.3f} ms'.format(
+                    self.executor['max_pending'],
+                    self.executor['wait_time'] / completed * 1e3
+                    if completed else 0.0,
+                    self.executor['max_wait'] * 1e3,
+                )
+            )
+        return '\n'.join(lines)
+
+
+def watch_statements(engine: Engine, report: LoadReport) -> None:
+    """Record time of each SQL statement, which includes lock wait."""
+
+    @listens_for(engine, 'before_cursor_execute')
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('strea_started', []).append(time.perf_counter())
+
+    @listens_for(engine, 'after_cursor_execute')
+    def after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['strea_started'].pop()
+        report.statements.append(time.perf_counter() - started)
+
+
+async def run_load(
+    bot: Bot,
+    client: FakeClient,
+    titles: Sequence[str],
+    *,
+    users: int=1000,
+    requests: int=5,
+    think: float=1.0,
+    ramp: float=0.0,
+    seed: int=0
+) -> LoadReport:
+    """Run simulated users concurrently.
+
+    Each user waits ``ramp * index / users`` seconds, then sends
+    ``requests`` commands with exponential think time of mean ``think``
+    seconds between them.
+
+    """
+
+    report = LoadReport()
+    watch_statements(bot.config.DATABASE_ENGINE, report)
+    if bot.async_engine:
+        watch_statements(bot.async_engine.sync_engine, report)
+
+    prefix = bot.config.PREFIX
+    names = [prefix + name for name, _ in COMMANDS]
+    weights = [weight for _, weight in COMMANDS]
+    channel = client.channel('simulation')
+
+    async def user(index: int) -> None:
+        rng = random.Random(seed * users + index)
+        author = FakeUser(id=f'load-{index}', name=f'load{index}')
+        if ramp:
+            await asyncio.sleep(ramp * index / users)
+
+        for _ in range(requests):
+            if think:
+                await asyncio.sleep(rng.expovariate(1 / think))
+
+            call, = rng.choices(names, weights)
+            content = call
+            if not call.endswith('리셋'):
+                content = '{} {}'.format(call, rng.choice(titles))
+            handler = bot.router.match(call)
+            name = handler.name if handler else call
+
+            started = time.perf_counter()
+            try:
+                await client.dispatch(FakeMessage(content, channel, author))
+            except Exception as e:
+                report.fail(name, time.perf_counter() - started, e)
+            else:
+                report.add(name, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[user(i) for i in range(users)])
+    await bot.outbound.flush()
+    report.elapsed = time.perf_counter() - started
+    report.executor = bot.executor.stats()
+    return report
@@ -0,0 +1,51 @@
+""":mod:`strea.log` --- non-blocking structured logging
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Log records are put on queue in event loop and written by background
+thread as JSON lines.
+
+"""
+
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+from attrdict import AttrDict
+
+__all__ = 'JSONFormatter', 'setup_logging'
+
+
+class JSONFormatter(logging.Formatter):
+    """Format record and its ``fields`` extra as one JSON line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        data.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def setup_logging(config: AttrDict) -> QueueListener:
+    """Route ``strea`` loggers to background writer and start it."""
+
+    records: queue.Queue = queue.Queue()
+
+    writer = logging.StreamHandler(sys.stdout)
+    writer.setFormatter(JSONFormatter())
+
+    logger = logging.getLogger('strea')
+    logger.setLevel(config.LOG_LEVEL)
+    logger.addHandler(QueueHandler(records))
+    logger.propagate = False
+
+    listener = QueueListener(records, writer, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,160 @@
+""":mod:`strea.manifest` --- command manifest of handler modules
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Manifest lists command names and aliases which each handler module
+registers, so :class:`~strea.router.Router` can know every command without
+importing handler modules. Module which registers non-command handler is
+marked eager, because its handlers should see every message.
+
+Manifest is JSON file. It is rebuilt when list of modules or modification
+time of their source files changes.
+
+"""
+
+import importlib
+import json
+import os
+import pathlib
+import sys
+import tempfile
+from typing import Any, Dict, Sequence
+
+from .box import Box
+
+__all__ = 'build', 'is_fresh', 'load', 'prepare', 'save'
+
+#: (:class:`int`) Version of manifest format
+VERSION = 1
+
+Manifest = Dict[str, Any]
+
+
+def _sources(module_names: Sequence[str]) -> Dict[str, float]:
+    sources: Dict[str, float] = {}
+    for name in module_names:
+        path = getattr(sys.modules.get(name), '__file__', None)
+        if path:
+            sources[path] = os.stat(path).st_mtime
+    return sources
+
+
+def build(module_names: Sequence[str], box: Box) -> Manifest:
+    """Import given modules and record commands which each one registers."""
+
+    modules: Dict[str, Any] = {}
+    for module_name in module_names:
+        known = {
+            type_: set(handlers) for type_, handlers in box.handlers.items()
+        }
+        known_aliases = set(box.aliases)
+
+        importlib.import_module(module_name)
+
+        commands: Dict[str, list] = {}
+        callback_modules = {module_name}
+        eager = False
+        for type_, handlers in box.handlers.items():
+            for name, handler in handlers.items():
+                if name in known.get(type_, ()):
+                    continue
+                callback_modules.add(handler.callback.__module__)
+                if handler.is_command:
+                    commands[name] = []
+                else:
+                    eager = True
+        for alias, name in box.aliases.items():
+            if alias not in known_aliases and name in commands:
+                commands[name].append(alias)
+
+        modules[module_name] = {
+            'eager': eager,
+            'commands': commands,
+            'sources': _sources(sorted(callback_modules)),
+        }
+
+    return {'version': VERSION, 'modules': modules}
+
+
+def is_fresh(manifest: Manifest, module_names: Sequence[str]) -> bool:
+    """Check manifest is made from current source of given modules."""
+
+    if manifest.get('version') != VERSION:
+        return False
+
+    modules = manifest['modules']
+    if sorted(modules) != sorted(module_names):
+        return False
+
+    for entry in modules.values():
+        for path, mtime in entry['sources'].items():
+            try:
+                if os.stat(path).st_mtime != mtime:
+                    return False
+            except OSError:
+                return False
+
+    return True
+
+
+def load(path: pathlib.Path) -> Manifest:
+    """Load manifest. Missing or broken file gives empty manifest."""
+
+    try:
+        with path.open(encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save(path: pathlib.Path, manifest: Manifest) -> None:
+    """Save manifest atomically.
+
+    Shards may rebuild manifest at the same time, so each one writes its own
+    temporary file.
+
+    """
+
+    with tempfile.NamedTemporaryFile(
+        'w',
+        encoding='utf-8',
+        dir=str(path.parent),
+        prefix=path.name + '.',
+        suffix='.tmp',
+        delete=False,
+    ) as f:
+        try:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, str(path))
+
+
+def prepare(
+    path: pathlib.Path,
+    module_names: Sequence[str],
+    box: Box
+) -> Dict[str, str]:
+    """Import eager modules and return map of command to lazy module.
+
+    Stale manifest is rebuilt, which imports every module.
+
+    """
+
+    manifest = load(path)
+    if not is_fresh(manifest, module_names):
+        save(path, build(module_names, box))
+        return {}
+
+    lazy: Dict[str, str] = {}
+    for module_name in module_names:
+        entry = manifest['modules'][module_name]
+        if entry['eager']:
+            importlib.import_module(module_name)
+            continue
+        for name, aliases in entry['commands'].items():
+            lazy[name] = module_name
+            for alias in aliases:
+                lazy.setdefault(alias, module_name)
+    return lazy
@@ -0,0 +1,304 @@
+""":mod:`strea.metrics` --- in-process metrics registry
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Counters, gauges and fixed-bucket histograms rendered in OpenMetrics text
+format. Updating metric is one dict lookup and one addition, so it is cheap
+enough for hot path.
+
+"""
+
+import asyncio
+import bisect
+import logging
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+__all__ = (
+    'CONTENT_TYPE',
+    'Counter',
+    'DEFAULT_BUCKETS',
+    'Gauge',
+    'Histogram',
+    'Registry',
+    'serve',
+)
+
+#: (:class:`str`) Content type of OpenMetrics text format
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+#: (:class:`tuple` of :class:`float`) Default latency buckets in seconds
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+    2.5, 5.0, 10.0,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(
+            n,
+            str(v).replace('\\', '\\\\').replace('"', '\\"').replace(
+                '\n', '\\n'),
+        ) for n, v in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class of metric family"""
+
+    type_name = 'unknown'
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str]=()
+    ) -> None:
+        """Initialize"""
+
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.children: Dict[Tuple[str, ...], 'Metric'] = {}
+
+    def labels(self, *values: str):
+        """Get child metric of given label values."""
+
+        try:
+            return self.children[values]
+        except KeyError:
+            if len(values) != len(self.labelnames):
+                raise ValueError('Incorrect count of label values')
+            child = self.children[values] = self._child()
+            return child
+
+    def _child(self):
+        raise NotImplementedError()
+
+    def _samples(self) -> List[Tuple[str, Tuple[str, ...], float]]:
+        raise NotImplementedError()
+
+    def render(self) -> List[str]:
+        """Render as OpenMetrics text lines."""
+
+        lines = [
+            f'# TYPE {self.name} {self.type_name}',
+            f'# HELP {self.name} {self.help}',
+        ]
+        for suffix, (names, values), value in self._samples():
+            lines.append('{}{}{} {}'.format(
+                self.name,
+                suffix,
+                _format_labels(names, values),
+                _format_value(value),
+            ))
+        return lines
+
+
+class _Value:
+    __slots__ = 'value',
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float=1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float=1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(Metric):
+    """Monotonic counter"""
+
+    type_name = 'counter'
+
+    def _child(self):
+        return _Value()
+
+    def inc(self, amount: float=1.0) -> None:
+        """Increase counter without label."""
+
+        self.labels().inc(amount)
+
+    def _samples(self):
+        return [
+            ('_total', (self.labelnames, k), c.value)
+            for k, c in self.children.items()
+        ]
+
+
+class Gauge(Metric):
+    """Gauge which is set directly or read from function at scrape time"""
+
+    type_name = 'gauge'
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str]=(),
+        func: Optional[Callable[[], float]]=None
+    ) -> None:
+        """Initialize"""
+
+        super(Gauge, self).__init__(name, help, labelnames)
+        self.func = func
+
+    def _child(self):
+        return _Value()
+
+    def set(self, value: float) -> None:
+        """Set gauge without label."""
+
+        self.labels().set(value)
+
+    def _samples(self):
+        if self.func is not None:
+            return [('', ((), ()), self.func())]
+        return [
+            ('', (self.labelnames, k), c.value)
+            for k, c in self.children.items()
+        ]
+
+
+class _Buckets:
+    __slots__ = 'bounds', 'counts', 'sum', 'count'
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(Metric):
+    """Histogram with fixed buckets"""
+
+    type_name = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str]=(),
+        buckets: Sequence[float]=DEFAULT_BUCKETS
+    ) -> None:
+        """Initialize"""
+
+        super(Histogram, self).__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _child(self):
+        return _Buckets(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Observe value without label."""
+
+        self.labels().observe(value)
+
+    def _samples(self):
+        samples = []
+        names = self.labelnames + ('le',)
+        for key, child in self.children.items():
+            cumulative = 0
+            for bound, count in zip(
+                self.buckets + (float('inf'),),
+                child.counts,
+            ):
+                cumulative += count
+                samples.append((
+                    '_bucket',
+                    (names, key + (_format_value(bound),)),
+                    cumulative,
+                ))
+            samples.append(('_sum', (self.labelnames, key), child.sum))
+            samples.append(('_count', (self.labelnames, key), child.count))
+        return samples
+
+
+class Registry:
+    """Collection of metrics"""
+
+    def __init__(self) -> None:
+        """Initialize"""
+
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Register metric. Same name returns already registered one."""
+
+        return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labelnames=()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames=(), func=None) -> Gauge:
+        return self.register(Gauge(name, help, labelnames, func))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames=(),
+        buckets=DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render every metric in OpenMetrics text format."""
+
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+async def serve(registry: Registry, host: str, port: int):
+    """Serve registry over HTTP on given local address."""
+
+    async def handle(reader, writer):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            if request.split(b' ')[:2] == [b'GET', b'/metrics']:
+                status = '200 OK'
+                body = registry.render().encode()
+            else:
+                status = '404 Not Found'
+                body = b'Not Found\n'
+            writer.write(
+                (
+                    f'HTTP/1.0 {status}\r\n'
+                    f'Content-Type: {CONTENT_TYPE}\r\n'
+                    f'Content-Length: {len(body)}\r\n'
+                    '\r\n'
+                ).encode() + body
+            )
+            await writer.drain()
+        except Exception:
+            logger.exception('Fail to serve metrics')
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
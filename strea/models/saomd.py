@@ -29,6 +29,9 @@ SCOUT_TYPE_LABEL: Dict[ScoutType, str] = {
     ScoutType.weapon: '무기',
 }
 
+#: (:class:`str`) Tag of reply caches which depend on scout data
+SCOUT_CACHE_TAG = 'saomd_scout'
+
 COST_TYPE_LABEL: Dict[CostType, str] = {
     CostType.record_crystal: '기록결정',
     CostType.diamond: '메모리 다이아',
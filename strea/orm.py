@@ -1,3 +1,6 @@
+import contextlib
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
 from attrdict import AttrDict
 
 from sqlalchemy import create_engine
@@ -5,12 +8,159 @@ from sqlalchemy.engine import Engine
 from sqlalchemy.event import listens_for
 from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm.session import Session as SessionType
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.sql.expression import select
 
-__all__ = 'Base', 'get_database_engine'
+from .compat import ContextVar, asynccontextmanager
+
+__all__ = (
+    'Base',
+    'Session',
+    'async_session_scope',
+    'call_in_session',
+    'current_session',
+    'get_async_database_engine',
+    'get_database_engine',
+    'get_session',
+    'run_sync_section',
+    'session_scope',
+    'transaction',
+)
 
 Base = declarative_base()
 
+Session = sessionmaker(autocommit=True)
+
+#: (:class:`~strea.compat.ContextVar`) Session of current asyncio task
+current_session: 'ContextVar[Optional[SessionType]]' = \
+    ContextVar('current_session', default=None)
+
+
+@contextlib.contextmanager
+def session_scope(engine: Engine) -> Iterator[SessionType]:
+    """Open session for current task, or reuse already opened one."""
+
+    sess = current_session.get()
+    if sess is not None:
+        yield sess
+        return
+
+    sess = Session(bind=engine)
+    token = current_session.set(sess)
+    try:
+        yield sess
+    finally:
+        current_session.reset(token)
+        sess.close()
+
+
+def get_session() -> SessionType:
+    """Get session opened by :func:`session_scope` in current task."""
+
+    sess = current_session.get()
+    if sess is None:
+        raise LookupError('There is no opened session in current task')
+    return sess
+
+
+def call_in_session(engine: Engine, func: Callable, *args, **kwargs) -> Any:
+    """Call function with session of current task, or with new session
+    which is closed after call if there is no opened one."""
+
+    with session_scope(engine):
+        return func(*args, **kwargs)
+
+
+@contextlib.contextmanager
+def transaction(sess: SessionType) -> Iterator[SessionType]:
+    """Commit changes of block.
+
+    It works with both of autocommit session and async session's
+    synchronous facade which always begins transaction implicitly.
+
+    """
+
+    if sess.autocommit:
+        with sess.begin():
+            yield sess
+        return
+
+    try:
+        yield sess
+    except:  # noqa: E722
+        sess.rollback()
+        raise
+    else:
+        sess.commit()
+
+
+def get_async_database_engine(config: AttrDict):
+    """Create async engine from ``DATABASE_ASYNC_URL``.
+
+    It needs SQLAlchemy 1.4+ and async driver like aiosqlite or asyncpg.
+    Install them with ``strea[async]``.
+
+    """
+
+    try:
+        return config.DATABASE_ASYNC_ENGINE
+    except AttributeError:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        return create_async_engine(
+            config.DATABASE_ASYNC_URL,
+            echo=config.DATABASE_ECHO,
+        )
+
+
+@asynccontextmanager
+async def async_session_scope(engine) -> AsyncIterator[Any]:
+    """Open :class:`~sqlalchemy.ext.asyncio.AsyncSession` for current task,
+    or reuse already opened one."""
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    sess = current_session.get()
+    if sess is not None:
+        yield sess
+        return
+
+    sess = AsyncSession(bind=engine)
+    token = current_session.set(sess)
+    try:
+        yield sess
+    finally:
+        current_session.reset(token)
+        await sess.close()
+
+
+def _run_with_session(sess: SessionType, func: Callable, args, kwargs):
+    token = current_session.set(sess)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        current_session.reset(token)
+
+
+async def run_sync_section(func: Callable, *args, **kwargs) -> Any:
+    """Run synchronous ORM code with async session of current task.
+
+    SQLAlchemy runs it in greenlet on event loop, so blocking IO of driver
+    become awaits. :func:`get_session` returns the synchronous facade of
+    the session inside of it. Session has to be opened by
+    :func:`async_session_scope` before.
+
+    """
+
+    return await get_session().run_sync(
+        _run_with_session,
+        func,
+        args,
+        kwargs,
+    )
+
 
 def get_database_engine(config: AttrDict) -> Engine:
     try:
@@ -18,7 +168,12 @@ def get_database_engine(config: AttrDict) -> Engine:
     except AttributeError:
         db_url = config.DATABASE_URL
         echo = config.DATABASE_ECHO
-        engine = create_engine(db_url, echo=echo)
+        kwargs = {}
+        if db_url in ('sqlite://', 'sqlite:///:memory:'):
+            # Share one in-memory database with executor threads.
+            kwargs['poolclass'] = StaticPool
+            kwargs['connect_args'] = {'check_same_thread': False}
+        engine = create_engine(db_url, echo=echo, **kwargs)
 
         @listens_for(engine, 'engine_connect')
         def ping_connection(connection, branch):
@@ -0,0 +1,198 @@
+""":mod:`strea.outbound` --- outbound message queue
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Per-channel message queue which keeps message order, respects send rate of
+each channel and coalesces queued messages into fewer sends.
+
+"""
+
+import asyncio
+import collections
+import logging
+import time
+from typing import Any, Deque, Dict, List, NamedTuple, Optional
+
+from .metrics import Histogram
+
+__all__ = 'MESSAGE_LIMIT', 'Outbound'
+
+#: (:class:`int`) Maximum length of Discord message
+MESSAGE_LIMIT = 2000
+
+logger = logging.getLogger(__name__)
+
+
+class Envelope(NamedTuple):
+    """Queued message"""
+
+    channel: Any
+    content: Optional[str]
+    kwargs: Dict[str, Any]
+    future: asyncio.Future
+
+
+class Outbound:
+    """Outbound dispatcher"""
+
+    def __init__(
+        self,
+        client,
+        *,
+        rate: int=5,
+        per: float=5.0,
+        limit: int=MESSAGE_LIMIT,
+        send_latency: Optional[Histogram]=None
+    ) -> None:
+        """Initialize"""
+
+        if rate < 1:
+            raise ValueError(f'rate should be at least 1, not {rate!r}')
+
+        self.client = client
+        self.rate = rate
+        self.per = per
+        self.limit = limit
+        self.send_latency = send_latency
+        self.queues: Dict[Any, Deque[Envelope]] = {}
+        self.workers: Dict[Any, asyncio.Task] = {}
+        self.history: Dict[Any, Deque[float]] = {}
+        self.sent = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.max_depth = 0
+
+    def send(
+        self,
+        channel,
+        content: Optional[str]=None,
+        **kwargs
+    ) -> asyncio.Future:
+        """Queue message and return future of sent message.
+
+        Awaiting future is optional. Failure is logged either way and
+        raised only to who awaits it.
+
+        """
+
+        key = channel.id
+        future = asyncio.get_event_loop().create_future()
+
+        queue = self.queues.setdefault(key, collections.deque())
+        queue.append(Envelope(channel, content, kwargs, future))
+        self.max_depth = max(self.max_depth, len(queue))
+
+        if key not in self.workers:
+            self.workers[key] = asyncio.ensure_future(self._work(key))
+
+        return future
+
+    async def _work(self, key) -> None:
+        queue = self.queues[key]
+        history = self.history.setdefault(
+            key,
+            collections.deque(maxlen=self.rate),
+        )
+        try:
+            while queue:
+                if len(history) >= self.rate:
+                    delay = history[0] + self.per - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+
+                batch = self._take(queue)
+                head = batch[0]
+                if len(batch) > 1:
+                    content = '\n'.join(e.content for e in batch)
+                    self.coalesced += len(batch) - 1
+                else:
+                    content = head.content
+
+                started = time.monotonic()
+                history.append(started)
+                try:
+                    message = await self.client.send_message(
+                        head.channel,
+                        content,
+                        **head.kwargs
+                    )
+                except Exception as e:
+                    self.failed += 1
+                    logger.exception('Fail to send message')
+                    for envelope in batch:
+                        if not envelope.future.done():
+                            envelope.future.set_exception(e)
+                            # Already logged. Mark it retrieved, so asyncio
+                            # does not log it again when nobody awaits it.
+                            envelope.future.exception()
+                else:
+                    self.sent += 1
+                    if self.send_latency is not None:
+                        self.send_latency.observe(time.monotonic() - started)
+                    for envelope in batch:
+                        if not envelope.future.done():
+                            envelope.future.set_result(message)
+        finally:
+            del self.workers[key]
+            if not queue:
+                del self.queues[key]
+                self._forget(key)
+
+    def _forget(self, key) -> None:
+        """Drop send history of idle channel once it can not delay sends."""
+
+        if key in self.workers:
+            # Worker calls it again when it exits.
+            return
+        history = self.history.get(key)
+        if history is None:
+            return
+        delay = history[-1] + self.per - time.monotonic() if history else 0
+        if delay > 0:
+            asyncio.get_event_loop().call_later(delay, self._forget, key)
+        else:
+            del self.history[key]
+
+    def _take(self, queue: Deque[Envelope]) -> List[Envelope]:
+        """Pop head message and following plain messages which fit."""
+
+        head = queue.popleft()
+        batch = [head]
+        if head.kwargs or head.content is None:
+            return batch
+
+        length = len(head.content)
+        while queue:
+            envelope = queue[0]
+            if envelope.kwargs or envelope.content is None:
+                break
+            length += 1 + len(envelope.content)
+            if length > self.limit:
+                break
+            batch.append(queue.popleft())
+
+        return batch
+
+    def queue_depth(self, channel=None) -> int:
+        """Count of queued messages of given channel or all channels."""
+
+        if channel is not None:
+            return len(self.queues.get(channel.id, ()))
+        return sum(len(q) for q in self.queues.values())
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of dispatcher metrics."""
+
+        return {
+            'channels': len(self.queues),
+            'pending': self.queue_depth(),
+            'sent': self.sent,
+            'coalesced': self.coalesced,
+            'failed': self.failed,
+            'max_depth': self.max_depth,
+        }
+
+    async def flush(self) -> None:
+        """Wait until every queued message is sent."""
+
+        while self.workers:
+            await asyncio.wait(list(self.workers.values()))
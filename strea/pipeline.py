@@ -0,0 +1,294 @@
+""":mod:`strea.pipeline` --- command dispatch pipeline
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Dispatch of one handler is an ordered list of named stages. Each stage
+records its elapsed time in :class:`Invocation`, and middlewares can wrap
+the whole invocation or new stages can be inserted between stages.
+
+"""
+
+import functools
+import time
+from typing import (Any, Awaitable, Callable, Dict, List, Optional, Sequence,
+                    Tuple)
+
+from .box import Handler
+from .cache import ResultCache, make_key
+from .compat import AsyncExitStack, ContextVar
+from .context import MessageContext
+from .orm import async_session_scope, session_scope
+
+__all__ = (
+    'DEFAULT_STAGES',
+    'Invocation',
+    'Middleware',
+    'Pipeline',
+    'Stage',
+    'current_invocation',
+)
+
+
+class Invocation:
+    """Per-invocation context of one handler"""
+
+    def __init__(self, bot, ctx: MessageContext, handler: Handler) -> None:
+        """Initialize"""
+
+        self.bot = bot
+        self.ctx = ctx
+        self.message = ctx.message
+        self.handler = handler
+        self.tokens: Sequence[str] = ()
+        self.options: Dict[str, Any] = {}
+        self.arguments: Dict[str, Any] = {}
+        self.remain_chunks: List[str] = []
+        self.kwargs: Dict[str, Any] = {}
+        self.result: Any = None
+        #: (:class:`bool`) Whether next handler of same message can run
+        self.propagate = False
+        #: (:class:`dict`) Elapsed seconds of each stage
+        self.timings: Dict[str, float] = {}
+        #: (:class:`list`) Replies which are recorded for reply cache
+        self.replies: Optional[List[Tuple[Optional[str], Dict]]] = None
+        self.exit_stack = AsyncExitStack()
+
+    def record(self, name: str, elapsed: float) -> None:
+        """Add elapsed time to given timing name."""
+
+        self.timings[name] = self.timings.get(name, 0.0) + elapsed
+
+    def record_reply(self, channel, content: Optional[str], kwargs: Dict):
+        """Record reply if reply cache wants it.
+
+        Reply to other channel makes invocation uncacheable.
+
+        """
+
+        if self.replies is None:
+            return
+        if getattr(channel, 'id', None) == self.message.channel.id:
+            self.replies.append((content, kwargs))
+        else:
+            self.replies = None
+
+
+#: (:class:`~strea.compat.ContextVar`) Invocation of current asyncio task
+current_invocation: 'ContextVar[Optional[Invocation]]' = \
+    ContextVar('current_invocation', default=None)
+
+#: Stage returns :const:`False` to stop pipeline
+Stage = Callable[[Invocation], Awaitable[bool]]
+
+#: Middleware receives invocation and coroutine function to call next
+Middleware = Callable[
+    [Invocation, Callable[[], Awaitable[None]]],
+    Awaitable[None],
+]
+
+
+class Pipeline:
+    """Ordered stages and middlewares"""
+
+    def __init__(self, stages: Sequence[Tuple[str, Stage]]) -> None:
+        """Initialize"""
+
+        self.stages: List[Tuple[str, Stage]] = list(stages)
+        self.middlewares: List[Middleware] = []
+
+    def add_stage(
+        self,
+        name: str,
+        stage: Stage,
+        *,
+        before: Optional[str]=None,
+        after: Optional[str]=None
+    ) -> None:
+        """Insert stage before or after named stage, or at the end."""
+
+        names = [n for n, _ in self.stages]
+        if before is not None:
+            index = names.index(before)
+        elif after is not None:
+            index = names.index(after) + 1
+        else:
+            index = len(names)
+        self.stages.insert(index, (name, stage))
+
+    def use(self, middleware: Middleware) -> Middleware:
+        """Add middleware. First added one becomes outermost."""
+
+        self.middlewares.append(middleware)
+        return middleware
+
+    async def run(self, invocation: Invocation) -> Invocation:
+        """Run every stage with middlewares."""
+
+        async def run_stages():
+            for name, stage in self.stages:
+                started = time.perf_counter()
+                try:
+                    proceed = await stage(invocation)
+                finally:
+                    invocation.record(name, time.perf_counter() - started)
+                if not proceed:
+                    return
+
+        call = run_stages
+        for middleware in reversed(self.middlewares):
+            call = _bind(middleware, invocation, call)
+
+        token = current_invocation.set(invocation)
+        try:
+            async with invocation.exit_stack:
+                await call()
+        finally:
+            current_invocation.reset(token)
+
+        return invocation
+
+
+def _bind(middleware: Middleware, invocation: Invocation, call_next):
+    async def call():
+        await middleware(invocation, call_next)
+    return call
+
+
+async def validate(inv: Invocation) -> bool:
+    validator = inv.handler.channel_validator
+    if validator:
+        if inv.handler.legacy_validator:
+            allowed = await validator(inv.bot.client, inv.message)
+            error = None
+        else:
+            allowed, error = validator(inv.message)
+        if not allowed:
+            if error:
+                await inv.bot.say(inv.message.channel, error)
+            inv.ctx.outcome = 'rejected'
+            inv.propagate = True
+            return False
+    return True
+
+
+async def tokenize(inv: Invocation) -> bool:
+    try:
+        inv.tokens = inv.ctx.tokenize(inv.handler.use_shlex)
+    except ValueError:
+        inv.ctx.outcome = 'parse_error'
+        await inv.bot.say(
+            inv.message.channel,
+            '*Error*: Can not parse this command'
+        )
+        return False
+    return True
+
+
+async def parse_options(inv: Invocation) -> bool:
+    try:
+        inv.options, inv.remain_chunks = inv.handler.parse_options(
+            inv.tokens)
+    except SyntaxError as e:
+        inv.ctx.outcome = 'parse_error'
+        await inv.bot.say(
+            inv.message.channel,
+            '*Error*\n{}'.format(e)
+        )
+        return False
+    return True
+
+
+async def parse_arguments(inv: Invocation) -> bool:
+    try:
+        inv.arguments, inv.remain_chunks = inv.handler.parse_arguments(
+            inv.remain_chunks
+        )
+    except SyntaxError as e:
+        inv.ctx.outcome = 'parse_error'
+        await inv.bot.say(
+            inv.message.channel,
+            '*Error*\n{}'.format(e)
+        )
+        return False
+    return True
+
+
+async def inject(inv: Invocation) -> bool:
+    inv.kwargs.update(inv.options)
+    inv.kwargs.update(inv.arguments)
+
+    dependencies = {
+        'bot': inv.bot,
+        'message': inv.message,
+        'raw': inv.ctx.args,
+        'remain_chunks': inv.remain_chunks,
+    }
+    for name in inv.handler.plan.injections:
+        inv.kwargs[name] = dependencies[name]
+    return True
+
+
+async def lookup_cache(inv: Invocation) -> bool:
+    cache = inv.handler.cache
+    if cache is None:
+        return True
+
+    values = [inv.options, inv.arguments, inv.remain_chunks]
+    if cache.stamp is not None:
+        values.append(await inv.bot.run_in_session(cache.stamp))
+    key = make_key(inv.handler.name, *values)
+    if key is None:
+        return True
+
+    try:
+        replies, propagate = cache.get(key)
+    except KeyError:
+        inv.replies = []
+        inv.exit_stack.push(functools.partial(_store_cache, inv, cache, key))
+        return True
+
+    inv.ctx.outcome = 'cached'
+    for content, kwargs in replies:
+        await inv.bot.say(inv.message.channel, content, **kwargs)
+    inv.propagate = propagate
+    return False
+
+
+def _store_cache(inv: Invocation, cache: ResultCache, key, exc_type, *args):
+    if exc_type is None and inv.ctx.outcome == 'ok' and \
+            inv.replies is not None:
+        cache.set(key, (tuple(inv.replies), inv.propagate))
+
+
+async def open_session(inv: Invocation) -> bool:
+    if not inv.handler.plan.needs_session:
+        return True
+
+    if inv.bot.async_engine:
+        inv.kwargs['sess'] = await inv.exit_stack.enter_async_context(
+            async_session_scope(inv.bot.async_engine)
+        )
+    else:
+        inv.kwargs['sess'] = inv.exit_stack.enter_context(
+            session_scope(inv.bot.config.DATABASE_ENGINE)
+        )
+    return True
+
+
+async def callback(inv: Invocation) -> bool:
+    inv.ctx.outcome = 'ok'
+    inv.result = await inv.handler.callback(**inv.kwargs)
+    inv.propagate = bool(inv.result)
+    return True
+
+
+#: (:class:`tuple`) Stages of default dispatch pipeline
+DEFAULT_STAGES: Tuple[Tuple[str, Stage], ...] = (
+    ('validate', validate),
+    ('tokenize', tokenize),
+    ('parse_options', parse_options),
+    ('parse_arguments', parse_arguments),
+    ('inject', inject),
+    ('cache', lookup_cache),
+    ('session', open_session),
+    ('callback', callback),
+)
@@ -0,0 +1,252 @@
+""":mod:`strea.replay` --- offline message replay
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Feed recorded or synthetic messages through :meth:`Bot.on_message` with
+:class:`~strea.fake.FakeClient` and report throughput and latency
+percentiles of each command.
+
+Recorded stream is JSON lines file. Each line has ``content`` and optional
+``channel``, ``author`` and ``private`` keys.
+
+"""
+
+import asyncio
+import collections
+import copy
+import json
+import math
+import pathlib
+import random
+import time
+from typing import (Dict, Iterable, Iterator, List, NamedTuple, Optional,
+                    Sequence, Tuple)
+
+from attrdict import AttrDict
+
+from .bot import Bot, SPACE_RE
+from .fake import FakeClient, FakeMessage, FakeUser
+from .orm import Base, Session
+
+__all__ = (
+    'Record',
+    'Report',
+    'load_records',
+    'make_bot',
+    'percentile',
+    'prepare_database',
+    'replay',
+    'synthetic_records',
+)
+
+#: (:class:`str`) Report key of message which is not command
+NOT_COMMAND = '(not command)'
+
+
+class Record(NamedTuple):
+    """One incoming message of stream"""
+
+    content: str
+    channel: str = 'simulation'
+    author: str = '1'
+    private: bool = False
+
+
+def load_records(path: pathlib.Path) -> List[Record]:
+    """Load recorded stream from JSON lines file."""
+
+    records = []
+    with path.open(encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(Record(**json.loads(line)))
+    return records
+
+
+def synthetic_records(
+    count: int,
+    prefix: str,
+    *,
+    users: int=100,
+    seed: int=0
+) -> List[Record]:
+    """Make stream of SAOMD scout commands mixed with chatter."""
+
+    from .models.saomd import ScoutType
+    from .saomd import ScoutMigration
+
+    titles: Dict[ScoutType, List[str]] = collections.defaultdict(list)
+    for cls in ScoutMigration.__subclasses__():
+        titles[cls.type].append(cls.title)
+
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        author = str(rng.randrange(users))
+        dice = rng.random()
+        if dice < 0.4:
+            content = '{}캐뽑 {}'.format(
+                prefix,
+                rng.choice(titles[ScoutType.character]),
+            )
+        elif dice < 0.7:
+            content = '{}무뽑 {}'.format(
+                prefix,
+                rng.choice(titles[ScoutType.weapon]),
+            )
+        elif dice < 0.75:
+            content = f'{prefix}시뮬결과리셋'
+        else:
+            content = 'chatter {}'.format(rng.randrange(1000))
+        records.append(Record(content, author=author))
+    return records
+
+
+def make_bot(config: AttrDict, **overrides) -> Tuple[Bot, FakeClient]:
+    """Make bot with fake client and in-memory database.
+
+    Discord rate limit, throttle and worker processes are turned off unless
+    ``overrides`` turn them on.
+
+    """
+
+    config = AttrDict(copy.deepcopy({
+        k: v for k, v in config.items() if not k.endswith('_ENGINE')
+    }))
+    config.update({
+        'DATABASE_URL': 'sqlite://',
+        'DATABASE_ASYNC_URL': '',
+        'OUTBOUND_PER': 0.0,
+        'THROTTLE': False,
+        'WORKERS': 0,
+    })
+    config.update(overrides)
+
+    client = FakeClient()
+    return Bot(config, client=client), client
+
+
+def prepare_database(bot: Bot) -> None:
+    """Create tables and SAOMD scouts."""
+
+    from .saomd import ScoutMigration
+
+    bot.orm_base.metadata.create_all(bot.config.DATABASE_ENGINE)
+    if bot.orm_base is not Base:
+        return
+
+    sess = Session(bind=bot.config.DATABASE_ENGINE)
+    try:
+        for cls in ScoutMigration.__subclasses__():
+            cls().patch(sess)
+    finally:
+        sess.close()
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+
+    if not values:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+class Report:
+    """Latencies of replayed messages"""
+
+    def __init__(self) -> None:
+        """Initialize"""
+
+        self.latencies: Dict[str, List[float]] = collections.defaultdict(list)
+        self.errors: Dict[str, int] = collections.Counter()
+        self.elapsed = 0.0
+
+    def add(self, name: str, latency: float, error: bool=False) -> None:
+        self.latencies[name].append(latency)
+        if error:
+            self.errors[name] += 1
+
+    @property
+    def count(self) -> int:
+        return sum(len(v) for v in self.latencies.values())
+
+    def rows(self) -> Iterator[Tuple[str, int, int, float, float, float]]:
+        """Name, count, errors and p50/p95/p99 seconds of each key."""
+
+        for name in sorted(self.latencies):
+            values = sorted(self.latencies[name])
+            yield (
+                name,
+                len(values),
+                self.errors[name],
+                percentile(values, 50),
+                percentile(values, 95),
+                percentile(values, 99),
+            )
+
+    def format(self) -> str:
+        lines = [
+            '{} messages in {:.3f}s, {:.1f} msgs/sec'.format(
+                self.count,
+                self.elapsed,
+                self.count / self.elapsed if self.elapsed else 0.0,
+            ),
+            '{:<16} {:>8} {:>6} {:>10} {:>10} {:>10}'.format(
+                'command', 'count', 'errors', 'p50 ms', 'p95 ms', 'p99 ms',
+            ),
+        ]
+        for name, count, errors, p50, p95, p99 in self.rows():
+            lines.append(
+                '{:<16} {:>8} {:>6} {:>10.3f} {:>10.3f} {:>10.3f}'.format(
+                    name, count, errors, p50 * 1e3, p95 * 1e3, p99 * 1e3,
+                )
+            )
+        return '\n'.join(lines)
+
+
+async def replay(
+    bot: Bot,
+    client: FakeClient,
+    records: Iterable[Record],
+    *,
+    concurrency: int=1,
+    report: Optional[Report]=None
+) -> Report:
+    """Feed records through ``on_message`` and measure each one."""
+
+    report = report or Report()
+    users: Dict[str, FakeUser] = {}
+    stream = iter(records)
+
+    async def feed():
+        for record in stream:
+            channel = client.channel(
+                record.channel,
+                is_private=record.private,
+            )
+            author = users.get(record.author)
+            if author is None:
+                author = users[record.author] = FakeUser(
+                    id=record.author,
+                    name=f'user{record.author}',
+                )
+            message = FakeMessage(record.content, channel, author)
+
+            call = SPACE_RE.split(record.content, 1)[0]
+            handler = bot.router.match(call)
+            name = handler.name if handler else NOT_COMMAND
+
+            started = time.perf_counter()
+            try:
+                await client.dispatch(message)
+            except Exception:
+                report.add(name, time.perf_counter() - started, True)
+            else:
+                report.add(name, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[feed() for _ in range(concurrency)])
+    await bot.outbound.flush()
+    report.elapsed += time.perf_counter() - started
+    return report
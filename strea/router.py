@@ -0,0 +1,72 @@
+""":mod:`strea.router` --- route message to handlers
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Hash-indexed lookup table built from :class:`~strea.box.Box`.
+
+Commands of lazy handler module are stubs which only know module name. The
+module is imported when one of its commands is called first time.
+
+"""
+
+import importlib
+from typing import Dict, Optional, Tuple
+
+from .box import Box, Handler
+
+__all__ = 'Router',
+
+
+class Router:
+    """Map command names and aliases to handlers"""
+
+    def __init__(
+        self,
+        box: Box,
+        prefix: str='',
+        lazy: Optional[Dict[str, str]]=None
+    ) -> None:
+        """Initialize"""
+
+        self.box = box
+        self.prefix = prefix
+        #: (:class:`dict`) Map of command name and alias to lazy module
+        self.lazy: Dict[str, str] = dict(lazy or {})
+        self.build()
+
+    def build(self) -> None:
+        """Build lookup table from handlers of box."""
+
+        box = self.box
+        self.commands: Dict[str, Handler] = {}
+        handlers = []
+
+        for name, handler in box.handlers['message'].items():
+            if handler.is_command:
+                self.commands[name] = handler
+            else:
+                handlers.append(handler)
+
+        for alias, name in box.aliases.items():
+            self.commands.setdefault(alias, box.handlers['message'][name])
+
+        self.handlers: Tuple[Handler, ...] = tuple(handlers)
+
+    def match(self, call: str) -> Optional[Handler]:
+        """Find command handler by given call."""
+
+        if not call.startswith(self.prefix):
+            return None
+
+        name = call[len(self.prefix):]
+        handler = self.commands.get(name)
+        if handler is None and name in self.lazy:
+            self.load(self.lazy[name])
+            handler = self.commands.get(name)
+        return handler
+
+    def load(self, module_name: str) -> None:
+        """Import lazy module and replace its stubs with real handlers."""
+
+        importlib.import_module(module_name)
+        self.lazy = {k: v for k, v in self.lazy.items() if v != module_name}
+        self.build()
@@ -3,7 +3,15 @@ from typing import List, Tuple
 
 from sqlalchemy.orm.exc import NoResultFound
 
-from .models.saomd import CostType, PlayerScout, Scout, ScoutType, Step
+from .cache import invalidate
+from .models.saomd import (
+    CostType,
+    PlayerScout,
+    SCOUT_CACHE_TAG,
+    Scout,
+    ScoutType,
+    Step,
+)
 
 
 FOUR_STAR_CHARACTERS: List[str] = [
@@ -133,11 +141,13 @@ class ScoutMigration:
             ).one()
         except NoResultFound:
             self.create(sess)
+            invalidate(SCOUT_CACHE_TAG)
             return MigrationStatus.create
 
         if self.version != scout.version:
             self.delete(sess)
             self.create(sess)
+            invalidate(SCOUT_CACHE_TAG)
             return MigrationStatus.update
 
         return MigrationStatus.passed
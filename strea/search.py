@@ -0,0 +1,247 @@
+""":mod:`strea.search` --- in-memory fuzzy title search
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Titles are decomposed into Hangul jamo once when index is built, and jamo
+n-grams of them are kept in inverted index. Query is decomposed once too,
+candidates which share most n-grams with it are picked from inverted index,
+and only those candidates are scored by :func:`fuzzywuzzy.fuzz.ratio`.
+
+Query typed only in initial consonants, like ``ㄷㄷ`` for 두근두근, does
+not score well with jamo ratio, so it is matched against choseong of titles
+instead.
+
+Indexes are cleared by :func:`strea.cache.invalidate` like reply cache.
+Data can be changed by other process too, so owner gives ``stamp`` which
+summarizes data when it builds index, and rebuilds index when stamp of
+data differs from :attr:`~TitleIndex.stamp` of index. Index built from no
+items is not ready, so it is rebuilt on every lookup until data appears.
+
+"""
+
+import collections
+from typing import (Dict, Hashable, Iterable, List, NamedTuple, Optional,
+                    Tuple)
+
+from fuzzywuzzy import fuzz
+
+from .cache import CACHES
+from .util import (CHOSEONG, JONGSEONG, choseong,
+                   normalize_korean_nfc_to_nfd)
+
+__all__ = 'ChoseongIndex', 'TitleIndex', 'is_choseong', 'ngrams'
+
+#: (:class:`frozenset`) Compatibility jamo of consonants
+CONSONANTS = frozenset(CHOSEONG + JONGSEONG)
+
+
+def ngrams(value: str, n: int=2) -> List[str]:
+    """Make n-grams of given string. Short string is n-gram itself."""
+
+    if len(value) <= n:
+        return [value] if value else []
+    return [value[i:i + n] for i in range(len(value) - n + 1)]
+
+
+class _Data(NamedTuple):
+
+    keys: List[Hashable]
+    titles: List[str]
+    jamos: List[str]
+    sizes: List[int]
+    postings: Dict[str, List[int]]
+
+
+class TitleIndex:
+    """Jamo n-gram inverted index of titles"""
+
+    def __init__(
+        self,
+        *,
+        n: int=2,
+        candidates: int=8,
+        tags: Iterable[str]=()
+    ) -> None:
+        """Initialize"""
+
+        self.n = n
+        self.candidates = candidates
+        self.tags = frozenset(tags)
+        self.data: Optional[_Data] = None
+        #: Stamp of data which index is built from
+        self.stamp: Optional[Hashable] = None
+        CACHES.add(self)
+
+    @property
+    def ready(self) -> bool:
+        return self.data is not None
+
+    def __len__(self) -> int:
+        return len(self.data.keys) if self.data else 0
+
+    def build(
+        self,
+        items: Iterable[Tuple[Hashable, str]],
+        stamp: Optional[Hashable]=None
+    ) -> None:
+        """Replace contents with given pairs of key and title."""
+
+        data = _Data([], [], [], [], collections.defaultdict(list))
+        for i, (key, title) in enumerate(items):
+            jamo = normalize_korean_nfc_to_nfd(title)
+            grams = set(ngrams(jamo, self.n))
+            data.keys.append(key)
+            data.titles.append(title)
+            data.jamos.append(jamo)
+            data.sizes.append(len(grams))
+            for gram in grams:
+                data.postings[gram].append(i)
+        if not data.keys:
+            self.clear()
+            return
+        self.data = data._replace(postings=dict(data.postings))
+        self.stamp = stamp
+
+    def clear(self) -> None:
+        self.data = None
+        self.stamp = None
+
+    def _candidates(self, data: _Data, grams: List[str]) -> List[int]:
+        shared: Dict[int, int] = collections.Counter()
+        for gram in grams:
+            for i in data.postings.get(gram, ()):
+                shared[i] += 1
+        if not shared:
+            return list(range(len(data.keys)))
+
+        size = len(grams)
+        ranked = sorted(
+            shared,
+            key=lambda i: (-2 * shared[i] / (data.sizes[i] + size), i),
+        )
+        return ranked[:self.candidates]
+
+    def search(
+        self,
+        query: str,
+        limit: int=1
+    ) -> List[Tuple[Hashable, int]]:
+        """Find keys of most similar titles with their ratio.
+
+        Ties are broken by order of :meth:`build`.
+
+        """
+
+        data = self.data
+        if not data:
+            return []
+
+        jamo = normalize_korean_nfc_to_nfd(query)
+        scored = sorted(
+            (-fuzz.ratio(data.jamos[i], jamo), i)
+            for i in self._candidates(data, list(set(ngrams(jamo, self.n))))
+        )
+        return [(data.keys[i], -ratio) for ratio, i in scored[:limit]]
+
+    def best(self, query: str) -> Optional[Hashable]:
+        """Key of most similar title, or :const:`None` if index is empty."""
+
+        found = self.search(query)
+        return found[0][0] if found else None
+
+
+def is_choseong(query: str) -> bool:
+    """Check query is typed only in initial consonants."""
+
+    query = ''.join(query.split())
+    return bool(query) and all(c in CONSONANTS for c in query)
+
+
+def _match(key: str, query: str) -> Optional[Tuple[int, int]]:
+    """Find span and start of shortest match of query in key as
+    subsequence. Earlier one is taken among matches of same span."""
+
+    best = None
+    start = key.find(query[0])
+    while start >= 0:
+        end = start
+        for c in query[1:]:
+            end = key.find(c, end + 1)
+            if end < 0:
+                return best
+        if best is None or end - start < best[0]:
+            best = end - start, start
+        start = key.find(query[0], start + 1)
+    return best
+
+
+class ChoseongIndex:
+    """Choseong of titles
+
+    Query matches title when its consonants appear in choseong of the title
+    in order, not necessarily next to each other, so ``ㄷㄷ`` finds
+    ``두근두근`` (``ㄷㄱㄷㄱ``). Titles where the consonants are closer
+    together come first, then titles where they start earlier, then order
+    of :meth:`build`. Characters other than Hangul are kept in choseong and
+    count for the start, but spaces are not. Lookup takes time of total
+    length of titles, which is fine for hundreds of titles.
+
+    """
+
+    def __init__(self, *, tags: Iterable[str]=()) -> None:
+        """Initialize"""
+
+        self.tags = frozenset(tags)
+        #: Keys and choseong of titles without spaces
+        self.data: Optional[Tuple[List[Hashable], List[str]]] = None
+        #: Stamp of data which index is built from
+        self.stamp: Optional[Hashable] = None
+        CACHES.add(self)
+
+    @property
+    def ready(self) -> bool:
+        return self.data is not None
+
+    def build(
+        self,
+        items: Iterable[Tuple[Hashable, str]],
+        stamp: Optional[Hashable]=None
+    ) -> None:
+        """Replace contents with given pairs of key and title."""
+
+        keys: List[Hashable] = []
+        choseongs: List[str] = []
+        for key, title in items:
+            keys.append(key)
+            choseongs.append(''.join(choseong(title).split()))
+        if not keys:
+            self.clear()
+            return
+        self.data = keys, choseongs
+        self.stamp = stamp
+
+    def clear(self) -> None:
+        self.data = None
+        self.stamp = None
+
+    def search(self, query: str) -> List[Hashable]:
+        """Keys of titles which match query, best match first."""
+
+        data = self.data
+        query = ''.join(query.split())
+        if not data or not query:
+            return []
+
+        keys, choseongs = data
+        found = []
+        for i, key in enumerate(choseongs):
+            match = _match(key, query)
+            if match is not None:
+                found.append((match, i))
+        found.sort()
+        return [keys[i] for _, i in found]
+
+    def best(self, query: str) -> Optional[Hashable]:
+        """Key of title which matches query best, or :const:`None`."""
+
+        found = self.search(query)
+        return found[0] if found else None
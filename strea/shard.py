@@ -0,0 +1,182 @@
+""":mod:`strea.shard` --- multi-process gateway sharding
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Each shard is one process which runs its own :class:`~strea.bot.Bot` with
+``shard_id`` and ``shard_count`` of gateway. Supervisor restarts shard which
+exits abnormally, with exponential backoff.
+
+"""
+
+import copy
+import logging
+import multiprocessing
+import multiprocessing.connection
+import signal
+import time
+from typing import Any, Callable, Dict, Optional
+
+from attrdict import AttrDict
+
+from .log import setup_logging
+
+__all__ = 'Supervisor', 'run_shard'
+
+logger = logging.getLogger(__name__)
+
+#: Function which runs one shard in child process
+Target = Callable[[AttrDict, int, int], Any]
+
+
+def shard_config(config: AttrDict, shard_id: int) -> AttrDict:
+    """Copy config for given shard."""
+
+    config = AttrDict(copy.deepcopy(dict(config)))
+    if config.METRICS_PORT:
+        config.METRICS_PORT += shard_id
+    return config
+
+
+def run_shard(config: AttrDict, shard_id: int, shard_count: int) -> None:
+    """Run bot of given shard. It is default target of supervisor."""
+
+    from .bot import Bot
+
+    bot = Bot(config, shard_id=shard_id, shard_count=shard_count)
+    bot.run()
+
+
+class Supervisor:
+    """Start shard processes and restart crashed one"""
+
+    def __init__(
+        self,
+        config: AttrDict,
+        shard_count: int,
+        *,
+        target: Target=run_shard,
+        restart_delay: float=1.0,
+        max_restart_delay: float=60.0,
+        stable_after: float=60.0,
+        context: Optional[Any]=None
+    ) -> None:
+        """Initialize"""
+
+        self.config = config
+        self.shard_count = shard_count
+        self.target = target
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.stable_after = stable_after
+        self.context = context or multiprocessing.get_context('spawn')
+        self.processes: Dict[int, multiprocessing.Process] = {}
+        self.started_at: Dict[int, float] = {}
+        self.delays: Dict[int, float] = {}
+        #: (:class:`dict`) Time when crashed shard is restarted
+        self.pending: Dict[int, float] = {}
+        self.restarts = 0
+        self.running = False
+
+    def start(self, shard_id: int) -> None:
+        """Start process of given shard."""
+
+        process = self.context.Process(
+            target=self.target,
+            args=(
+                shard_config(self.config, shard_id),
+                shard_id,
+                self.shard_count,
+            ),
+            name=f'strea-shard-{shard_id}',
+            daemon=True,
+        )
+        process.start()
+        self.processes[shard_id] = process
+        self.started_at[shard_id] = time.monotonic()
+        logger.info(
+            'Shard started',
+            extra={'fields': {'shard': shard_id, 'pid': process.pid}},
+        )
+
+    def reap(self) -> None:
+        """Handle exited shards."""
+
+        now = time.monotonic()
+        for shard_id, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del self.processes[shard_id]
+            fields = {'shard': shard_id, 'exitcode': process.exitcode}
+            if process.exitcode == 0 or not self.running:
+                logger.info('Shard exited', extra={'fields': fields})
+                continue
+
+            if now - self.started_at[shard_id] >= self.stable_after:
+                delay = self.restart_delay
+            else:
+                delay = min(
+                    self.delays.get(shard_id, self.restart_delay / 2) * 2,
+                    self.max_restart_delay,
+                )
+            self.delays[shard_id] = delay
+            self.pending[shard_id] = now + delay
+            fields['delay'] = delay
+            logger.warning('Shard crashed', extra={'fields': fields})
+
+    def restart_due(self) -> None:
+        """Restart crashed shards whose backoff is over."""
+
+        now = time.monotonic()
+        for shard_id, at in list(self.pending.items()):
+            if at <= now:
+                del self.pending[shard_id]
+                self.restarts += 1
+                self.start(shard_id)
+
+    def wait(self, timeout: Optional[float]) -> None:
+        """Wait until any shard exits or timeout."""
+
+        sentinels = [p.sentinel for p in self.processes.values()]
+        if sentinels:
+            multiprocessing.connection.wait(sentinels, timeout)
+        elif timeout:
+            time.sleep(timeout)
+
+    def stop(self, *args) -> None:
+        """Stop supervising and terminate every shard."""
+
+        self.running = False
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+
+    def run(self) -> None:
+        """Run every shard until all of them exit normally or stopped."""
+
+        self.running = True
+        listener = setup_logging(self.config)
+        previous = signal.signal(signal.SIGTERM, self.stop)
+        try:
+            for shard_id in range(self.shard_count):
+                self.start(shard_id)
+
+            while self.running and (self.processes or self.pending):
+                timeout = None
+                if self.pending:
+                    timeout = max(
+                        min(self.pending.values()) - time.monotonic(),
+                        0.0,
+                    )
+                self.wait(timeout)
+                self.reap()
+                self.restart_due()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+            for process in self.processes.values():
+                process.join()
+            self.reap()
+            if previous is not None:
+                signal.signal(signal.SIGTERM, previous)
+            listener.stop()
@@ -0,0 +1,110 @@
+""":mod:`strea.throttle` --- token bucket rate limiter
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Limit command usage per author and per channel.
+
+"""
+
+import collections
+import time
+from typing import Hashable, Optional
+
+__all__ = 'Throttle', 'TokenBucket'
+
+
+class TokenBucket:
+    """Token bucket which refills ``rate`` tokens per second"""
+
+    __slots__ = 'rate', 'capacity', 'tokens', 'updated_at'
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        """Initialize"""
+
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def refill(self, now: float) -> float:
+        """Refill tokens and return current tokens."""
+
+        tokens = self.tokens + (now - self.updated_at) * self.rate
+        self.tokens = min(self.capacity, tokens)
+        self.updated_at = now
+        return self.tokens
+
+
+class Throttle:
+    """Keyed token bucket limiter for authors and channels"""
+
+    def __init__(
+        self,
+        *,
+        user_rate: float,
+        user_burst: float,
+        channel_rate: float,
+        channel_burst: float,
+        max_keys: int=10000
+    ) -> None:
+        """Initialize"""
+
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.channel_rate = channel_rate
+        self.channel_burst = channel_burst
+        self.max_keys = max_keys
+        self.users: 'collections.OrderedDict[Hashable, TokenBucket]' = \
+            collections.OrderedDict()
+        self.channels: 'collections.OrderedDict[Hashable, TokenBucket]' = \
+            collections.OrderedDict()
+        self.rejected = 0
+
+    def _bucket(
+        self,
+        buckets: 'collections.OrderedDict[Hashable, TokenBucket]',
+        key: Hashable,
+        rate: float,
+        burst: float,
+        now: float,
+    ) -> TokenBucket:
+        """Get bucket of key. Least recently used one is dropped when
+        there are too many keys."""
+
+        try:
+            bucket = buckets[key]
+        except KeyError:
+            if len(buckets) >= self.max_keys:
+                buckets.popitem(last=False)
+            bucket = buckets[key] = TokenBucket(rate, burst, now)
+        else:
+            buckets.move_to_end(key)
+            bucket.refill(now)
+        return bucket
+
+    def consume(
+        self,
+        user: Hashable,
+        channel: Hashable,
+        cost: float=1.0,
+        now: Optional[float]=None
+    ) -> bool:
+        """Take ``cost`` tokens from both buckets, or nothing if either of
+        them has not enough tokens."""
+
+        if now is None:
+            now = time.monotonic()
+
+        user_bucket = self._bucket(
+            self.users, user, self.user_rate, self.user_burst, now,
+        )
+        channel_bucket = self._bucket(
+            self.channels, channel, self.channel_rate, self.channel_burst, now,
+        )
+
+        if user_bucket.tokens < cost or channel_bucket.tokens < cost:
+            self.rejected += 1
+            return False
+
+        user_bucket.tokens -= cost
+        channel_bucket.tokens -= cost
+        return True
@@ -2,10 +2,13 @@ import inspect
 from types import SimpleNamespace
 from typing import (
     Any,
+    Callable,
     Dict,
     Mapping,
     MutableSequence,
     Sequence,
+    Tuple,
+    TypeVar,
     Union,
 )
 
@@ -14,8 +17,8 @@ class Namespace(SimpleNamespace):
     """Typed Namespace."""
 
     def __init__(self, **kwargs) -> None:
-        for k, t in self.__annotations__.items():
-            kwargs[k] = cast(t, kwargs.get(k))
+        for k, convert in converters_of(type(self)):
+            kwargs[k] = convert(kwargs.get(k))
 
         super(Namespace, self).__init__(**kwargs)
 
@@ -23,59 +26,158 @@ class Namespace(SimpleNamespace):
 NoneType = type(None)
 UnionType = type(Union)
 
+#: Function which converts raw value into annotated type
+Converter = Callable[[Any], Any]
 
-def cast(t, value):
-    """Magical casting."""
+#: (:class:`dict`) Compiled converter of each type
+CONVERTERS: Dict[Any, Converter] = {}
+
+
+def _identity(value):
+    return value
+
+
+def _none(value):
+    return None
+
+
+def type_args(t) -> Tuple:
+    """Type arguments of generic type. Unbound type variables are dropped.
+
+    It works with :mod:`typing` of both Python 3.6 and 3.7+.
+
+    """
+
+    args = getattr(t, '__args__', None) or ()
+    if all(isinstance(a, TypeVar) for a in args):
+        return ()
+    return args
+
+
+def origin_of(t):
+    """Class which generic type is made from.
+
+    Python 3.6 gives :mod:`typing` class like :class:`typing.List` and 3.7+
+    gives builtin class like :class:`list`. Both are subclass of builtin
+    one.
+
+    """
+
+    origin = getattr(t, '__origin__', None)
+    return t if origin is None else origin
+
+
+def is_union(t) -> bool:
+    return type(t) == UnionType or getattr(t, '__origin__', None) is Union
+
+
+def compile_converter(t) -> Converter:
+    """Get cached converter of given type, compile it if not exists."""
+
+    try:
+        return CONVERTERS[t]
+    except KeyError:
+        converter = CONVERTERS[t] = _compile(t)
+        return converter
+    except TypeError:  # unhashable annotation
+        return _compile(t)
 
-    if type(t) == UnionType:
-        for ty in t.__args__:
+
+def _compile(t) -> Converter:
+    if t == Any or isinstance(t, TypeVar):
+        return _identity
+    if t == NoneType:
+        return _none
+    if is_union(t):
+        return _compile_union(t)
+    if t in (str, bytes):
+        return t
+
+    cls = origin_of(t)
+    if inspect.isclass(cls):
+        args = type_args(t)
+
+        if issubclass(cls, Namespace):
+            return lambda value: t(**value)
+
+        if issubclass(cls, tuple):
+            if getattr(t, '__tuple_use_ellipsis__', False):
+                item = compile_converter(args[0])
+                return lambda value: tuple(item(x) for x in value)
+            if len(args) == 2 and args[1] is Ellipsis:
+                item = compile_converter(args[0])
+                return lambda value: tuple(item(x) for x in value)
+            if args:
+                items = tuple(compile_converter(ty) for ty in args)
+                return lambda value: tuple(
+                    convert(x) for convert, x in zip(items, value)
+                )
+            return tuple
+
+        if issubclass(cls, set):
+            if args:
+                item = compile_converter(args[0])
+                return lambda value: {item(x) for x in value}
+            return set
+
+        if issubclass(cls, (list, MutableSequence, Sequence)):
+            if args:
+                item = compile_converter(args[0])
+                return lambda value: [item(x) for x in value]
+            return list
+
+        if issubclass(cls, Mapping):
+            if args:
+                key = compile_converter(args[0])
+                item = compile_converter(args[1])
+                return lambda value: {
+                    key(k): item(v) for k, v in value.items()
+                }
+            return dict
+
+    return t
+
+
+def _compile_union(t) -> Converter:
+    members = tuple(compile_converter(ty) for ty in t.__args__)
+    optional = NoneType in t.__args__
+
+    def convert(value):
+        if value is None and optional:
+            # str(None) must not turn missing value into 'None'.
+            return None
+        for member in members:
             try:
-                return cast(ty, value)
-            except:  # noqa: E722
+                return member(value)
+            except Exception:
                 continue
-        raise ValueError()
-    elif t == Any:
-        return value
-    elif t == NoneType:
-        return None
-    elif t in (str, bytes):
-        return t(value)
-
-    if inspect.isclass(t):
-        if issubclass(t, Namespace):
-            return t(**value)
-
-        if issubclass(t, tuple):
-            if t.__args__:
-                return tuple(cast(ty, x) for ty, x in zip(t.__args__, value))
-            else:
-                return tuple(value)
-
-        if issubclass(t, set):
-            if t.__args__:
-                return {cast(t.__args__[0], x) for x in value}
-            else:
-                return set(value)
-
-        if issubclass(t, (list, MutableSequence, Sequence)):
-            if t.__args__:
-                return [cast(t.__args__[0], x) for x in value]
-            else:
-                return list(value)
-
-        if issubclass(t, (Dict, Mapping)):
-            if t.__args__:
-                return {
-                    cast(t.__args__[0], k): cast(t.__args__[1], v)
-                    for k, v in value.items()
-                }
-            else:
-                return dict(value)
+        raise ValueError(f'{value!r} does not match with {t}')
+
+    return convert
+
+
+def converters_of(cls) -> Tuple[Tuple[str, Converter], ...]:
+    """Compiled converters of annotated fields of given class."""
+
+    try:
+        return cls.__dict__['__converters__']
+    except KeyError:
+        converters = tuple(
+            (k, compile_converter(t))
+            for k, t in getattr(cls, '__annotations__', {}).items()
+        )
+        setattr(cls, '__converters__', converters)
+        return converters
+
+
+def cast(t, value):
+    """Magical casting."""
 
-    return t(value)
+    return compile_converter(t)(value)
 
 
 def is_container(t) -> bool:
     """Check given value is container type?"""
 
-    return any(issubclass(t, x) for x in [set, tuple, list])
+    cls = origin_of(t)
+    return inspect.isclass(cls) and issubclass(cls, (set, tuple, list))
@@ -1,5 +1,6 @@
 import datetime
-import unicodedata
+import functools
+from typing import Dict
 
 from babel.dates import get_timezone
 
@@ -8,6 +9,10 @@ from fuzzywuzzy import fuzz
 from sqlalchemy.sql.expression import func
 
 __all__ = (
+    'CHOSEONG',
+    'HANGUL_MODES',
+    'JONGSEONG',
+    'JUNGSEONG',
     'KOREAN_END',
     'KOREAN_START',
     'KST',
@@ -15,9 +20,12 @@ __all__ = (
     'UTC',
     'bold',
     'bool2str',
+    'choseong',
     'code',
+    'decompose_hangul',
     'fuzzy_korean_ratio',
     'get_count',
+    'hangul_table',
     'italics',
     'normalize_korean_nfc_to_nfd',
     'preformatted',
@@ -41,13 +49,89 @@ KOREAN_START = ord('가')
 KOREAN_END = ord('힣')
 
 
+#: (:class:`str`) Compatibility jamo of each initial consonant
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+
+#: (:class:`str`) Compatibility jamo of each medial vowel
+JUNGSEONG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+
+#: (:class:`str`) Compatibility jamo of each final consonant
+JONGSEONG = 'ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ'
+
+#: (:class:`tuple`) Output modes of :func:`decompose_hangul`
+HANGUL_MODES = 'nfd', 'choseong', 'compat'
+
+_L_BASE = 0x1100
+_V_BASE = 0x1161
+_T_BASE = 0x11A7
+_V_COUNT = len(JUNGSEONG)
+_T_COUNT = len(JONGSEONG) + 1
+
+
+@functools.lru_cache(maxsize=None)
+def hangul_table(mode: str) -> Dict[int, str]:
+    """Make :meth:`str.translate` table of given mode.
+
+    ``nfd`` decomposes syllables into conjoining jamo like
+    :func:`unicodedata.normalize`, ``choseong`` leaves only initial
+    consonant of each syllable and ``compat`` decomposes syllables into
+    compatibility jamo which users type. Latter two also turn conjoining
+    jamo into compatibility jamo, and ``choseong`` drops conjoining vowels
+    and final consonants.
+
+    """
+
+    if mode not in HANGUL_MODES:
+        raise ValueError(f'unknown mode: {mode!r}')
+
+    table: Dict[int, str] = {}
+    if mode != 'nfd':
+        for i, c in enumerate(CHOSEONG):
+            table[_L_BASE + i] = c
+        for i, c in enumerate(JUNGSEONG):
+            table[_V_BASE + i] = c if mode == 'compat' else ''
+        for i, c in enumerate(JONGSEONG, 1):
+            table[_T_BASE + i] = c if mode == 'compat' else ''
+
+    for code in range(KOREAN_START, KOREAN_END + 1):
+        index = code - KOREAN_START
+        lead = index // (_V_COUNT * _T_COUNT)
+        vowel = index % (_V_COUNT * _T_COUNT) // _T_COUNT
+        tail = index % _T_COUNT
+        if mode == 'nfd':
+            table[code] = chr(_L_BASE + lead) + chr(_V_BASE + vowel) + (
+                chr(_T_BASE + tail) if tail else ''
+            )
+        elif mode == 'choseong':
+            table[code] = CHOSEONG[lead]
+        else:
+            table[code] = CHOSEONG[lead] + JUNGSEONG[vowel] + (
+                JONGSEONG[tail - 1] if tail else ''
+            )
+    return table
+
+
+@functools.lru_cache(maxsize=1024)
+def decompose_hangul(value: str, mode: str='nfd') -> str:
+    """Decompose Hangul syllables of string in one pass.
+
+    Recently decomposed strings are cached.
+
+    """
+
+    return value.translate(hangul_table(mode))
+
+
 def normalize_korean_nfc_to_nfd(value: str) -> str:
     """Normalize Korean string to NFD."""
 
-    return ''.join(
-        unicodedata.normalize('NFD', x) if KOREAN_START <= ord(x) <= KOREAN_END
-        else x for x in list(value)
-    )
+    return decompose_hangul(value, 'nfd')
+
+
+def choseong(value: str) -> str:
+    """Leave only initial consonants of Hangul syllables."""
+
+    return decompose_hangul(value, 'choseong')
 
 
 def fuzzy_korean_ratio(str1: str, str2: str) -> int:
@@ -0,0 +1,419 @@
+""":mod:`strea.worker` --- run commands in worker processes
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Gateway process only receives, routes and parses messages. Parsed command
+invocation is sent to worker process over IPC queue, and worker runs the
+callback. Replies of worker come back over another queue and are sent by
+gateway.
+
+Worker process gives callback :class:`WorkerBot` and :class:`RemoteMessage`
+instead of real :class:`~strea.bot.Bot` and :class:`discord.Message`, so
+only :meth:`~WorkerBot.say`, :meth:`~WorkerBot.run_in_session`,
+:meth:`~WorkerBot.run_in_executor` and ``config`` of bot are available in
+callback.
+
+"""
+
+import asyncio
+import importlib
+import itertools
+import logging
+import multiprocessing
+import pickle
+import queue
+import threading
+import traceback
+from typing import Any, Callable, Dict, NamedTuple, Optional, Set, Tuple
+
+from attrdict import AttrDict
+
+from .box import box
+from .compat import AsyncExitStack
+from .orm import (
+    async_session_scope,
+    call_in_session,
+    get_async_database_engine,
+    get_database_engine,
+    run_sync_section,
+    session_scope,
+)
+from .pipeline import Invocation
+
+__all__ = (
+    'RemoteAuthor',
+    'RemoteChannel',
+    'RemoteError',
+    'RemoteMessage',
+    'WorkerBot',
+    'WorkerPool',
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RemoteError(Exception):
+    """Callback raised exception in worker process"""
+
+
+class RemoteChannel(NamedTuple):
+    """Picklable snapshot of channel"""
+
+    id: str
+    name: Optional[str]
+    is_private: bool
+
+
+class RemoteAuthor(NamedTuple):
+    """Picklable snapshot of author"""
+
+    id: str
+    name: Optional[str]
+    bot: bool
+
+
+class RemoteMessage(NamedTuple):
+    """Picklable snapshot of message"""
+
+    id: Optional[str]
+    content: str
+    channel: RemoteChannel
+    author: RemoteAuthor
+    server_id: Optional[str]
+
+    @classmethod
+    def from_message(cls, message) -> 'RemoteMessage':
+        channel = message.channel
+        author = message.author
+        server = getattr(message, 'server', None)
+        return cls(
+            getattr(message, 'id', None),
+            message.content,
+            RemoteChannel(
+                channel.id,
+                getattr(channel, 'name', None),
+                getattr(channel, 'is_private', False),
+            ),
+            RemoteAuthor(
+                author.id,
+                getattr(author, 'name', None),
+                getattr(author, 'bot', False),
+            ),
+            server and server.id,
+        )
+
+
+class Job(NamedTuple):
+    """Command invocation sent to worker"""
+
+    id: int
+    name: str
+    kwargs: Dict[str, Any]
+    raw: str
+    remain_chunks: Tuple[str, ...]
+    message: RemoteMessage
+
+
+class WorkerBot:
+    """Bot proxy given to callback in worker process"""
+
+    def __init__(self, worker: 'Worker', job_id: int) -> None:
+        """Initialize"""
+
+        self.worker = worker
+        self.job_id = job_id
+        self.config = worker.config
+
+    async def say(self, channel, content: Optional[str]=None, **kwargs):
+        """Send reply through gateway."""
+
+        self.worker.responses.put(
+            ('say', self.job_id, channel.id, content, kwargs)
+        )
+
+    async def run_in_executor(self, func: Callable, *args, **kwargs) -> Any:
+        """Run blocking function. Worker process may block."""
+
+        return func(*args, **kwargs)
+
+    async def run_in_session(self, func: Callable, *args, **kwargs) -> Any:
+        """Run synchronous DB section with session of current job, which
+        is opened if job doesn't have one."""
+
+        if self.worker.async_engine:
+            async with async_session_scope(self.worker.async_engine):
+                return await run_sync_section(func, *args, **kwargs)
+        return call_in_session(self.config.DATABASE_ENGINE, func, *args,
+                               **kwargs)
+
+
+class Worker:
+    """Loop of worker process"""
+
+    def __init__(
+        self,
+        config: AttrDict,
+        requests: multiprocessing.Queue,
+        responses: multiprocessing.Queue
+    ) -> None:
+        """Initialize"""
+
+        self.config = config
+        self.requests = requests
+        self.responses = responses
+
+        config.DATABASE_ENGINE = get_database_engine(config)
+        self.async_engine = None
+        if config.DATABASE_ASYNC_URL:
+            self.async_engine = get_async_database_engine(config)
+
+        for module_name in config.HANDLERS:
+            importlib.import_module(module_name)
+
+        for module_name in config.MODELS:
+            importlib.import_module(module_name)
+
+    async def handle(self, job: Job) -> bool:
+        handler = box.handlers['message'][job.name]
+        kwargs = dict(job.kwargs)
+        dependencies = {
+            'bot': WorkerBot(self, job.id),
+            'message': job.message,
+            'raw': job.raw,
+            'remain_chunks': list(job.remain_chunks),
+        }
+        for name in handler.plan.injections:
+            kwargs[name] = dependencies[name]
+
+        async with AsyncExitStack() as stack:
+            if handler.plan.needs_session:
+                if self.async_engine:
+                    kwargs['sess'] = await stack.enter_async_context(
+                        async_session_scope(self.async_engine)
+                    )
+                else:
+                    kwargs['sess'] = stack.enter_context(
+                        session_scope(self.config.DATABASE_ENGINE)
+                    )
+            return bool(await handler.callback(**kwargs))
+
+    def run(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        while True:
+            job = self.requests.get()
+            if job is None:
+                break
+
+            try:
+                propagate = loop.run_until_complete(self.handle(job))
+            except Exception:
+                self.responses.put(
+                    ('done', job.id, False, traceback.format_exc())
+                )
+            else:
+                self.responses.put(('done', job.id, propagate, None))
+        loop.close()
+
+
+def run_worker(
+    config: AttrDict,
+    requests: multiprocessing.Queue,
+    responses: multiprocessing.Queue
+) -> None:
+    Worker(config, requests, responses).run()
+
+
+class WorkerPool:
+    """Worker processes and bookkeeping of gateway side"""
+
+    def __init__(
+        self,
+        bot,
+        processes: int,
+        *,
+        context: Optional[Any]=None
+    ) -> None:
+        """Initialize"""
+
+        self.bot = bot
+        self.size = processes
+        self.context = context or multiprocessing.get_context('spawn')
+        self.responses = self.context.Queue()
+        self.processes: Dict[int, multiprocessing.Process] = {}
+        #: (:class:`dict`) Request queue of each worker process
+        self.requests: Dict[int, multiprocessing.Queue] = {}
+        #: (:class:`dict`) Job ids which each worker process has
+        self.running: Dict[int, Set[int]] = {}
+        self.jobs: Dict[int, Tuple[Invocation, asyncio.Future]] = {}
+        self.assigned: Dict[int, int] = {}
+        self.counter = itertools.count()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.reader: Optional[threading.Thread] = None
+        self.submitted = 0
+        self.failed = 0
+
+    def config(self) -> AttrDict:
+        return AttrDict({
+            k: v for k, v in self.bot.config.items()
+            if not k.endswith('_ENGINE')
+        })
+
+    def spawn(self) -> None:
+        requests = self.context.Queue()
+        process = self.context.Process(
+            target=run_worker,
+            args=(self.config(), requests, self.responses),
+            name='strea-worker',
+            daemon=True,
+        )
+        process.start()
+        self.processes[process.pid] = process
+        self.requests[process.pid] = requests
+        self.running[process.pid] = set()
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop]=None) -> None:
+        """Start worker processes and response reader. Idempotent."""
+
+        if self.reader is not None:
+            return
+
+        self.loop = loop or asyncio.get_event_loop()
+        for _ in range(self.size):
+            self.spawn()
+        self.reader = threading.Thread(
+            target=self.read,
+            name='strea-worker-reader',
+            daemon=True,
+        )
+        self.reader.start()
+
+    def read(self) -> None:
+        while True:
+            try:
+                response = self.responses.get(timeout=1.0)
+            except queue.Empty:
+                self.loop.call_soon_threadsafe(self.check)
+                continue
+            if response is None:
+                break
+            self.loop.call_soon_threadsafe(self.dispatch, response)
+
+    def dispatch(self, response: Tuple) -> None:
+        kind, job_id, *rest = response
+        if job_id not in self.jobs:
+            return
+        inv, future = self.jobs[job_id]
+        if kind == 'say':
+            channel_id, content, kwargs = rest
+            channel = inv.message.channel
+            if channel.id != channel_id:
+                channel = self.bot.client.get_channel(channel_id)
+            inv.record_reply(channel, content, kwargs)
+            self.bot.outbound.send(channel, content, **kwargs)
+        elif kind == 'done':
+            propagate, error = rest
+            del self.jobs[job_id]
+            pid = self.assigned.pop(job_id)
+            self.running[pid].discard(job_id)
+            if future.done():
+                return
+            if error is None:
+                future.set_result(propagate)
+            else:
+                self.failed += 1
+                future.set_exception(RemoteError(error))
+
+    def check(self) -> None:
+        """Fail jobs of dead worker and replace it."""
+
+        for pid, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            del self.processes[pid]
+            del self.requests[pid]
+            for job_id in self.running.pop(pid):
+                del self.assigned[job_id]
+                _, future = self.jobs.pop(job_id)
+                if not future.done():
+                    self.failed += 1
+                    future.set_exception(RemoteError(
+                        f'Worker process {pid} exited with code '
+                        f'{process.exitcode}'
+                    ))
+            logger.warning(
+                'Worker exited',
+                extra={'fields': {'pid': pid, 'exitcode': process.exitcode}},
+            )
+            self.spawn()
+
+    async def submit(self, inv: Invocation, kwargs: Dict[str, Any]) -> bool:
+        """Run invocation in least busy worker and wait until it is done."""
+
+        self.start()
+
+        job = Job(
+            next(self.counter),
+            inv.handler.name,
+            kwargs,
+            inv.ctx.args,
+            tuple(inv.remain_chunks),
+            RemoteMessage.from_message(inv.message),
+        )
+        pid = min(self.running, key=lambda p: len(self.running[p]))
+        future = asyncio.get_event_loop().create_future()
+        self.jobs[job.id] = inv, future
+        self.assigned[job.id] = pid
+        self.running[pid].add(job.id)
+        self.requests[pid].put(job)
+        self.submitted += 1
+        return await future
+
+    async def stage(self, inv: Invocation) -> bool:
+        """Pipeline stage which runs command in worker.
+
+        Handler which is not command or whose parsed arguments can not be
+        pickled runs in gateway process as usual.
+
+        """
+
+        if not inv.handler.is_command:
+            return True
+        injections = inv.handler.plan.injections
+        kwargs = {
+            k: v for k, v in inv.kwargs.items() if k not in injections
+        }
+        try:
+            pickle.dumps(kwargs)
+        except Exception:
+            return True
+
+        inv.ctx.outcome = 'ok'
+        inv.propagate = await self.submit(inv, kwargs)
+        return False
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of pool metrics."""
+
+        return {
+            'processes': len(self.processes),
+            'inflight': len(self.jobs),
+            'submitted': self.submitted,
+            'failed': self.failed,
+        }
+
+    def shutdown(self) -> None:
+        """Stop worker processes and response reader."""
+
+        for requests in self.requests.values():
+            requests.put(None)
+        for process in self.processes.values():
+            process.join(5.0)
+            if process.is_alive():
+                process.terminate()
+        self.processes.clear()
+        self.requests.clear()
+        self.running.clear()
+        if self.reader is not None:
+            self.responses.put(None)
+            self.reader.join()
+            self.reader = None
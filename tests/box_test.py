@@ -0,0 +1,309 @@
+import random
+from typing import Any, Dict, List, Tuple
+
+from pytest import mark
+
+from strea.box import Box, Handler
+from strea.command import argument, option
+from strea.type import cast
+
+
+def legacy_parse_options(handler: Handler, chunk: List[str]):
+    """Option parser before cursor-based one, which pops tokens."""
+
+    end = False
+    options = handler.plan.options
+    result: Dict[str, Any] = {}
+    required = {o.dest for o in options if o.required}
+
+    for option_ in options:
+        if option_.multiple:
+            result[option_.dest] = []
+        elif callable(option_.default):
+            result[option_.dest] = option_.default()
+        else:
+            result[option_.dest] = option_.default
+
+    while not end and chunk:
+        for option_ in options:
+            name = chunk.pop(0)
+            if name.startswith(option_.name + '='):
+                name, new_chunk = name.split('=', 1)
+                chunk.insert(0, new_chunk)
+
+            if name == option_.name:
+                if option_.nargs == 0:
+                    result[option_.dest] = option_.value
+                else:
+                    try:
+                        length = len(chunk)
+                        args = [chunk.pop(0) for _ in range(option_.nargs)]
+                    except IndexError:
+                        raise SyntaxError(option_.count_error.format(
+                            name=option_.name,
+                            expected=option_.nargs,
+                            given=length,
+                        ))
+                    try:
+                        if option_.container_cls:
+                            if option_.multiple:
+                                r = cast(option_.type_, args)
+                            else:
+                                r = option_.container_cls(
+                                    cast(option_.type_, x) for x in args
+                                )
+                        else:
+                            r = cast(option_.type_, args[0])
+                    except ValueError as e:
+                        raise SyntaxError(option_.type_error.format(
+                            name=option_.name,
+                            e=e,
+                        ))
+
+                    if option_.transform_func:
+                        try:
+                            if option_.container_cls:
+                                r = option_.container_cls(
+                                    option_.transform_func(x) for x in r
+                                )
+                            else:
+                                r = option_.transform_func(r)
+                        except ValueError as e:
+                            raise SyntaxError(option_.transform_error.format(
+                                name=option_.name,
+                                e=e,
+                            ))
+
+                    if option_.multiple:
+                        result[option_.dest].append(r[0])
+                    else:
+                        result[option_.dest] = r
+
+                required.discard(option_.dest)
+                break
+
+            chunk.insert(0, name)
+        else:
+            end = True
+
+    if required:
+        raise SyntaxError('\n'.join(
+            o.count_error.format(name=o.name, expected=o.nargs, given=0)
+            for o in options if o.dest in required
+        ))
+
+    return result, chunk
+
+
+def legacy_parse_arguments(handler: Handler, chunk: List[str]):
+    """Argument parser before cursor-based one, which pops tokens."""
+
+    result: Dict[str, Any] = {}
+    arguments = handler.plan.arguments
+
+    for i, argument_ in enumerate(arguments):
+        r = None
+        length = argument_.nargs
+        if argument_.nargs < 0:
+            length = len(chunk) - sum(a.nargs for a in arguments[i:]) - 1
+
+        if length < 1:
+            raise SyntaxError(argument_.count_error.format(
+                name=argument_.name,
+                expected='>0',
+                given=0,
+            ))
+        if length <= len(chunk):
+            args = [chunk.pop(0) for _ in range(length)]
+        else:
+            raise SyntaxError(argument_.count_error.format(
+                name=argument_.name,
+                expected=argument_.nargs,
+                given=len(chunk),
+            ))
+        try:
+            if argument_.concat:
+                r = ' '.join(args)
+            elif argument_.container_cls:
+                r = argument_.container_cls(
+                    cast(argument_.type_, x) for x in args
+                )
+            elif argument_.typing_has_container:
+                r = cast(argument_.type_, args)
+            else:
+                r = cast(argument_.type_, args[0])
+        except ValueError as e:
+            raise SyntaxError(argument_.type_error.format(
+                name=argument_.name,
+                e=e,
+            ))
+
+        if argument_.transform_func:
+            try:
+                if argument_.container_cls:
+                    r = argument_.container_cls(
+                        argument_.transform_func(x) for x in r
+                    )
+                else:
+                    r = argument_.transform_func(r)
+            except ValueError as e:
+                raise SyntaxError(argument_.transform_error.format(
+                    name=argument_.name,
+                    e=e,
+                ))
+
+        if r is not None:
+            result[argument_.dest] = r
+
+    return result, chunk
+
+
+def positive(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise ValueError(f'{number} is not positive')
+    return number
+
+
+box = Box()
+
+
+@box.command('options')
+@option('--count', '-c', default=1)
+@option('--up/--down', default=False)
+@option('--tag', multiple=True)
+@option('--size', nargs=2)
+@option('--level', transform_func=positive, default=1)
+async def options_command(
+    bot,
+    message,
+    count: int,
+    up: bool,
+    tag: List[str],
+    size: int,
+    level: int,
+):
+    pass
+
+
+@box.command('required')
+@option('--name', required=True)
+@option('--ratio', default=0.5)
+async def required_command(bot, message, name: str, ratio: float):
+    pass
+
+
+@box.command('arguments')
+@argument('first')
+@argument('middle', nargs=-1)
+@argument('last', transform_func=positive)
+async def arguments_command(bot, message, first: int, middle, last: int):
+    pass
+
+
+@box.command('concat')
+@argument('head', nargs=2)
+@argument('words', nargs=-1, concat=True)
+async def concat_command(bot, message, head: Tuple[int, int], words: str):
+    pass
+
+
+def outcome(parse, handler: Handler, tokens: List[str]):
+    try:
+        return parse(handler, tokens)
+    except SyntaxError as e:
+        return 'error', str(e)
+
+
+def parse_new_options(handler: Handler, tokens: List[str]):
+    result, remain = handler.parse_options(tokens)
+    return result, list(remain)
+
+
+def parse_new_arguments(handler: Handler, tokens: List[str]):
+    result, remain = handler.parse_arguments(tokens)
+    return result, list(remain)
+
+
+OPTION_CASES = [
+    ('options', []),
+    ('options', ['--count', '3', 'word']),
+    ('options', ['-c=4', '--up', 'a', 'b']),
+    ('options', ['--down', '--tag', 'x', '--tag', 'y', 'rest']),
+    ('options', ['--size', '3', '4', '--count', '2']),
+    ('options', ['--size', '3']),
+    ('options', ['--count', 'many']),
+    ('options', ['--count']),
+    ('options', ['--level', '0']),
+    ('options', ['--level=5', '--count=6', '--unknown', '--count', '7']),
+    ('options', ['word', '--count', '2']),
+    ('required', []),
+    ('required', ['--ratio', '0.25']),
+    ('required', ['--name', 'strea', '--ratio', '2']),
+    ('required', ['--name=strea', 'tail']),
+]
+
+ARGUMENT_CASES = [
+    ('arguments', ['1', '2']),
+    ('arguments', ['1', 'a', 'b', 'c', '2']),
+    ('arguments', ['1']),
+    ('arguments', []),
+    ('arguments', ['x', 'a', '2']),
+    ('arguments', ['1', 'a', '0']),
+    ('concat', ['1', '2', 'hello', 'world']),
+    ('concat', ['1', '2']),
+    ('concat', ['1', 'b', 'c']),
+    ('concat', ['1']),
+]
+
+
+@mark.parametrize('name, tokens', OPTION_CASES)
+def test_parse_options_like_legacy(name: str, tokens: List[str]):
+    handler = box.handlers['message'][name]
+    assert outcome(parse_new_options, handler, list(tokens)) == \
+        outcome(legacy_parse_options, handler, list(tokens))
+
+
+@mark.parametrize('name, tokens', ARGUMENT_CASES)
+def test_parse_arguments_like_legacy(name: str, tokens: List[str]):
+    handler = box.handlers['message'][name]
+    assert outcome(parse_new_arguments, handler, list(tokens)) == \
+        outcome(legacy_parse_arguments, handler, list(tokens))
+
+
+VOCABULARY = [
+    '--count', '-c', '-c=2', '--count=x', '--up', '--down', '--tag', '--size',
+    '--level', '--level=0', '--name', '--name=a', '--ratio', '--unknown',
+    '0', '1', '2', '-1', '0.5', 'word', 'x', '',
+]
+
+
+@mark.parametrize('name', ['options', 'required', 'arguments', 'concat'])
+def test_random_tokens_like_legacy(name: str):
+    handler = box.handlers['message'][name]
+    generator = random.Random(name)
+    for _ in range(2000):
+        tokens = [
+            generator.choice(VOCABULARY)
+            for _ in range(generator.randrange(8))
+        ]
+        new = outcome(parse_new_options, handler, list(tokens))
+        assert new == outcome(legacy_parse_options, handler, list(tokens))
+        if new[0] == 'error':
+            continue
+        remain = new[1]
+        assert outcome(parse_new_arguments, handler, list(remain)) == \
+            outcome(legacy_parse_arguments, handler, list(remain))
+
+
+@mark.parametrize('name', ['arguments', 'concat'])
+def test_random_arguments_like_legacy(name: str):
+    handler = box.handlers['message'][name]
+    generator = random.Random(name)
+    for _ in range(2000):
+        tokens = [
+            generator.choice(['0', '1', '2', 'x'])
+            for _ in range(generator.randrange(7))
+        ]
+        assert outcome(parse_new_arguments, handler, list(tokens)) == \
+            outcome(legacy_parse_arguments, handler, list(tokens))
@@ -0,0 +1,109 @@
+import copy
+
+from attrdict import AttrDict
+
+from pytest import mark, raises
+
+from strea.bot import Bot
+from strea.box import Box
+from strea.cache import ResultCache, invalidate, make_key
+from strea.command import argument
+from strea.config import DEFAULT
+from strea.fake import FakeClient, FakeMessage, FakeUser
+
+
+def test_hit_and_miss():
+    cache = ResultCache(ttl=10.0)
+    with raises(KeyError):
+        cache.get('key', now=0.0)
+    cache.set('key', 'value', now=0.0)
+    assert cache.get('key', now=1.0) == 'value'
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_expiry():
+    cache = ResultCache(ttl=10.0)
+    cache.set('key', 'value', now=0.0)
+    assert cache.get('key', now=9.9) == 'value'
+    with raises(KeyError):
+        cache.get('key', now=10.0)
+    assert 'key' not in cache.entries
+
+
+def test_least_recently_used_is_evicted():
+    cache = ResultCache(maxsize=2)
+    cache.set('a', 1, now=0.0)
+    cache.set('b', 2, now=0.0)
+    assert cache.get('a', now=0.0) == 1
+    cache.set('c', 3, now=0.0)
+    assert list(cache.entries) == ['a', 'c']
+
+
+def test_discard():
+    cache = ResultCache()
+    cache.set('key', 'value')
+    cache.discard('key')
+    cache.discard('key')
+    with raises(KeyError):
+        cache.get('key')
+
+
+def test_invalidate_by_tag():
+    scouts = ResultCache(tags=['scout'])
+    other = ResultCache(tags=['other'])
+    scouts.set('key', 'value')
+    other.set('key', 'value')
+    invalidate('scout')
+    assert not scouts.entries
+    assert other.get('key') == 'value'
+    invalidate()
+    assert not other.entries
+
+
+def test_make_key():
+    assert make_key('name', {'b': [1, 2], 'a': {3}}, ()) == \
+        make_key('name', {'a': {3}, 'b': (1, 2)}, [])
+    assert make_key('name', 1) != make_key('other', 1)
+    assert make_key('name', object) is not None
+    assert make_key('name', {'a': bytearray()}) is None
+
+
+def make_bot(box: Box) -> Bot:
+    config = AttrDict(copy.deepcopy(DEFAULT))
+    config.update({
+        'PREFIX': '!',
+        'DATABASE_URL': 'sqlite://',
+        'OUTBOUND_PER': 0.0,
+    })
+    return Bot(config, using_box=box, client=FakeClient())
+
+
+@mark.asyncio
+async def test_cached_reply_is_keyed_by_stamp():
+    box = Box()
+    stamp = [1]
+    calls = []
+
+    @box.command('square', cache=ResultCache(stamp=lambda: stamp[0]))
+    @argument('number')
+    async def square(bot, message, number: int):
+        calls.append(number)
+        await bot.say(message.channel, str(number * number * stamp[0]))
+
+    bot = make_bot(box)
+    client = bot.client
+    channel = client.channel('general')
+    author = FakeUser(id='1', name='user1')
+
+    async def send(content: str) -> str:
+        await client.dispatch(FakeMessage(content, channel, author))
+        await bot.outbound.flush()
+        return client.sent[-1].content
+
+    assert await send('!square 3') == '9'
+    assert await send('!square 3') == '9'
+    assert await send('!square 4') == '16'
+    assert calls == [3, 4]
+    stamp[0] = 2
+    assert await send('!square 3') == '18'
+    assert calls == [3, 4, 3]
@@ -0,0 +1,141 @@
+import asyncio
+import concurrent.futures
+
+from pytest import mark, raises
+
+from strea.compat import (_AsyncExitStack, _ContextVar, _asynccontextmanager,
+                          _copy_context)
+
+
+@mark.asyncio
+async def test_context_var_isolated_per_task():
+    var = _ContextVar('var', default=None)
+    started = asyncio.Event()
+    seen = {}
+
+    async def run(name: str, wait: bool):
+        var.set(name)
+        if wait:
+            await started.wait()
+        else:
+            started.set()
+        await asyncio.sleep(0)
+        seen[name] = var.get()
+
+    await asyncio.gather(run('a', True), run('b', False))
+    assert seen == {'a': 'a', 'b': 'b'}
+    assert var.get() is None
+
+
+@mark.asyncio
+async def test_context_var_reset():
+    var = _ContextVar('var', default='default')
+    outer = var.set('outer')
+    inner = var.set('inner')
+    assert var.get() == 'inner'
+    var.reset(inner)
+    assert var.get() == 'outer'
+    var.reset(outer)
+    assert var.get() == 'default'
+
+
+@mark.asyncio
+async def test_copy_context_carries_values_into_thread():
+    var = _ContextVar('var', default=None)
+    var.set('task')
+    context = _copy_context()
+    with concurrent.futures.ThreadPoolExecutor(1) as pool:
+        assert pool.submit(context.run, var.get).result() == 'task'
+        assert pool.submit(var.get).result() is None
+
+
+class Resource:
+
+    def __init__(self, log: list, name: str, suppress: bool=False) -> None:
+        self.log = log
+        self.name = name
+        self.suppress = suppress
+
+    def __enter__(self):
+        self.log.append(('enter', self.name))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.log.append(('exit', self.name, exc_type))
+        return self.suppress
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+@mark.asyncio
+async def test_exit_stack_unwinds_in_reverse_order():
+    log = []
+    async with _AsyncExitStack() as stack:
+        stack.enter_context(Resource(log, 'sync'))
+        await stack.enter_async_context(Resource(log, 'async'))
+    assert log == [
+        ('enter', 'sync'),
+        ('enter', 'async'),
+        ('exit', 'async', None),
+        ('exit', 'sync', None),
+    ]
+
+
+@mark.asyncio
+async def test_exit_stack_propagates_exception():
+    log = []
+    with raises(KeyError):
+        async with _AsyncExitStack() as stack:
+            stack.enter_context(Resource(log, 'sync'))
+            await stack.enter_async_context(Resource(log, 'async'))
+            raise KeyError('body')
+    assert log[2:] == [('exit', 'async', KeyError), ('exit', 'sync', KeyError)]
+
+
+@mark.asyncio
+async def test_exit_stack_suppressed_exception():
+    log = []
+    async with _AsyncExitStack() as stack:
+        stack.enter_context(Resource(log, 'outer'))
+        await stack.enter_async_context(Resource(log, 'inner', True))
+        raise KeyError('body')
+    assert log[2:] == [('exit', 'inner', KeyError), ('exit', 'outer', None)]
+
+
+@mark.asyncio
+async def test_exit_stack_exception_raised_while_unwinding():
+    log = []
+
+    def fail(exc_type, exc, tb):
+        log.append(('fail', exc_type))
+        raise ValueError('exit')
+
+    with raises(ValueError):
+        async with _AsyncExitStack() as stack:
+            stack.enter_context(Resource(log, 'outer'))
+            stack.push(fail)
+            raise KeyError('body')
+    assert log[1:] == [('fail', KeyError), ('exit', 'outer', ValueError)]
+
+
+@mark.asyncio
+async def test_exception_reaches_generator_on_stack():
+    log = []
+
+    @_asynccontextmanager
+    async def scope():
+        try:
+            yield 'value'
+        except KeyError as e:
+            log.append(('caught', e.args[0]))
+            raise
+
+    with raises(KeyError):
+        async with _AsyncExitStack() as stack:
+            assert await stack.enter_async_context(scope()) == 'value'
+            raise KeyError('body')
+    assert log == [('caught', 'body')]
@@ -0,0 +1,126 @@
+import asyncio
+import time
+
+from pytest import mark, raises
+
+from strea.fake import FakeChannel, FakeClient
+from strea.outbound import Outbound
+
+
+class RecordingClient(FakeClient):
+    """Fake client which keeps time and arguments of each send"""
+
+    def __init__(self, **options) -> None:
+        """Initialize"""
+
+        super().__init__(**options)
+        self.calls = []
+
+    async def send_message(self, destination, content=None, **kwargs):
+        self.calls.append(
+            (time.monotonic(), destination.name, content, kwargs),
+        )
+        if content == 'fail':
+            raise RuntimeError('send failed')
+        return await super().send_message(destination, content, **kwargs)
+
+
+@mark.asyncio
+async def test_queued_plain_messages_are_coalesced():
+    client = RecordingClient()
+    outbound = Outbound(client, rate=5, per=0.0)
+    channel = FakeChannel(name='general')
+    futures = [outbound.send(channel, str(i)) for i in range(3)]
+    await outbound.flush()
+    assert [c[2] for c in client.calls] == ['0\n1\n2']
+    assert {f.result() for f in futures} == {client.sent[0]}
+    assert outbound.stats()['coalesced'] == 2
+
+
+@mark.asyncio
+async def test_message_with_options_is_sent_alone():
+    client = RecordingClient()
+    outbound = Outbound(client, rate=5, per=0.0)
+    channel = FakeChannel(name='general')
+    outbound.send(channel, 'a')
+    outbound.send(channel, 'b')
+    outbound.send(channel, 'c', tts=True)
+    outbound.send(channel, 'd')
+    outbound.send(channel, embed='embed')
+    outbound.send(channel, 'e')
+    await outbound.flush()
+    assert [c[2:] for c in client.calls] == [
+        ('a\nb', {}),
+        ('c', {'tts': True}),
+        ('d', {}),
+        (None, {'embed': 'embed'}),
+        ('e', {}),
+    ]
+
+
+@mark.asyncio
+async def test_coalesced_message_fits_limit():
+    client = RecordingClient()
+    outbound = Outbound(client, rate=5, per=0.0, limit=10)
+    channel = FakeChannel(name='general')
+    for content in ['abcd', 'efgh', 'ij', 'klmnopqrst', 'u']:
+        outbound.send(channel, content)
+    await outbound.flush()
+    assert [c[2] for c in client.calls] == [
+        'abcd\nefgh', 'ij', 'klmnopqrst', 'u',
+    ]
+
+
+@mark.asyncio
+async def test_sends_of_channel_are_rate_limited():
+    client = RecordingClient()
+    outbound = Outbound(client, rate=2, per=0.2)
+    general = FakeChannel(name='general')
+    other = FakeChannel(name='other')
+    # Messages with options are not coalesced, so each one is a send.
+    for i in range(3):
+        outbound.send(general, f'general {i}', tts=True)
+    outbound.send(other, 'other')
+    await outbound.flush()
+
+    times = {}
+    for at, name, content, kwargs in client.calls:
+        times.setdefault(name, []).append(at)
+    assert len(times['general']) == 3
+    assert times['general'][2] - times['general'][0] >= 0.2 - 0.01
+    assert times['general'][1] - times['general'][0] < 0.1
+    # Other channel has its own budget.
+    assert times['other'][0] - times['general'][0] < 0.2
+
+
+@mark.asyncio
+async def test_failure_reaches_future():
+    client = RecordingClient()
+    outbound = Outbound(client, rate=5, per=0.0)
+    channel = FakeChannel(name='general')
+    future = outbound.send(channel, 'fail', tts=True)
+    ok = outbound.send(channel, 'ok')
+    with raises(RuntimeError):
+        await future
+    assert (await ok).content == 'ok'
+    stats = outbound.stats()
+    assert (stats['sent'], stats['failed']) == (1, 1)
+
+
+@mark.asyncio
+async def test_history_of_idle_channel_is_dropped():
+    client = RecordingClient()
+    outbound = Outbound(client, rate=2, per=0.1)
+    channel = FakeChannel(name='general')
+    await outbound.send(channel, 'hello')
+    await outbound.flush()
+    assert channel.id in outbound.history
+    await asyncio.sleep(0.15)
+    assert outbound.history == {}
+    assert outbound.queues == {}
+    assert outbound.workers == {}
+
+
+def test_rate_should_be_positive():
+    with raises(ValueError):
+        Outbound(FakeClient(), rate=0)
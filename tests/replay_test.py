@@ -0,0 +1,91 @@
+import copy
+import json
+import pathlib
+
+from attrdict import AttrDict
+
+from pytest import mark
+
+from strea.config import DEFAULT
+from strea.replay import (NOT_COMMAND, Record, Report, load_records,
+                          make_bot, percentile, prepare_database, replay,
+                          synthetic_records)
+
+
+def test_percentile():
+    values = [0.1, 0.2, 0.3, 0.4]
+    assert percentile(values, 50) == 0.2
+    assert percentile(values, 99) == 0.4
+    assert percentile(values, 0) == 0.1
+    assert percentile([], 50) == 0.0
+
+
+def test_load_records(tmpdir):
+    path = pathlib.Path(str(tmpdir.join('stream.jsonl')))
+    path.write_text('\n'.join([
+        json.dumps({'content': '!캐뽑 두근두근'}),
+        '',
+        json.dumps({'content': 'hi', 'author': '2', 'private': True}),
+    ]), encoding='utf-8')
+    assert load_records(path) == [
+        Record('!캐뽑 두근두근'),
+        Record('hi', author='2', private=True),
+    ]
+
+
+def test_synthetic_records_are_reproducible():
+    records = synthetic_records(50, '!', users=3, seed=1)
+    assert records == synthetic_records(50, '!', users=3, seed=1)
+    assert records != synthetic_records(50, '!', users=3, seed=2)
+    assert {r.author for r in records} <= {'0', '1', '2'}
+    assert any(r.content.startswith('!캐뽑 ') for r in records)
+
+
+def make_scout_bot():
+    config = AttrDict(copy.deepcopy(DEFAULT))
+    config.update(
+        PREFIX='!',
+        HANDLERS=['strea.handlers.saomd'],
+        MODELS=['strea.models'],
+    )
+    bot, client = make_bot(config)
+    prepare_database(bot)
+    return bot, client
+
+
+@mark.asyncio
+async def test_replay_reports_each_command():
+    bot, client = make_scout_bot()
+    records = synthetic_records(40, '!', seed=3)
+
+    report = await replay(bot, client, records, concurrency=4)
+
+    assert report.count == len(records)
+    assert sum(report.errors.values()) == 0
+    assert NOT_COMMAND in report.latencies
+    assert '캐릭뽑기' in report.latencies
+    assert client.sent_count > 0
+    assert bot.outbound.queue_depth() == 0
+    assert report.format().startswith(f'{len(records)} messages in ')
+
+
+@mark.asyncio
+async def test_replay_ignores_message_of_bot_itself():
+    bot, client = make_scout_bot()
+    records = [Record('!캐뽑 ㄷㄷ', author=client.user.id)]
+    report = await replay(bot, client, records)
+    assert report.count == 1
+    assert client.sent_count == 0
+    report = await replay(bot, client, [Record('!캐뽑 ㄷㄷ')])
+    assert client.sent_count == 1
+
+
+def test_report_rows():
+    report = Report()
+    report.add('a', 0.2)
+    report.add('a', 0.1, error=True)
+    report.add('b', 0.3)
+    assert list(report.rows()) == [
+        ('a', 2, 1, 0.1, 0.2, 0.2),
+        ('b', 1, 0, 0.3, 0.3, 0.3),
+    ]
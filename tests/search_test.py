@@ -0,0 +1,118 @@
+from pytest import fixture, mark
+
+from sqlalchemy import create_engine
+
+from strea.cache import invalidate
+from strea.handlers.saomd import (SCOUT_CACHE_TAG,
+                                  get_similar_scout_by_title)
+from strea.models.saomd import Scout, ScoutType
+from strea.orm import Base, Session
+from strea.search import ChoseongIndex, TitleIndex, is_choseong
+
+
+TITLES = [
+    (1, 'SAO 게임 클리어'),
+    (2, '두근두근 발렌타인'),
+    (3, '신부 아스나'),
+    (4, '두 사람의 발렌타인'),
+    (5, '여름 해변 아스나'),
+]
+
+
+@mark.parametrize('query, expected', [
+    ('ㄷㄷ', True),
+    ('ㄷ ㄱ', True),
+    ('ㄳ', True),
+    ('ㄷ근', False),
+    ('dd', False),
+    (' ', False),
+    ('', False),
+])
+def test_is_choseong(query: str, expected: bool):
+    assert is_choseong(query) is expected
+
+
+def test_choseong_index_matches_in_order():
+    index = ChoseongIndex()
+    index.build(TITLES)
+    assert index.search('ㄷㄱㄷㄱ') == [2]
+    assert index.search('ㅂㄹㅌㅇ') == [2, 4]
+    assert index.search('ㄱㄷ') == [2]
+    assert index.best('ㅇㅅㄴ') == 3
+    assert index.best('ㅋㄹㅇ') == 1
+    assert index.best('ㅎㅎ') is None
+
+
+def test_choseong_index_ranks_closer_match_first():
+    index = ChoseongIndex()
+    index.build(TITLES)
+    # ㄷㄱㄷㄱㅂㄹㅌㅇ has ㄷ and ㅂ closer than ㄷㅅㄹㅇㅂㄹㅌㅇ does.
+    assert index.search('ㄷㅂ') == [2, 4]
+    # Same span, earlier start first: ㅅㅂㅇㅅㄴ and ㅇㄹㅎㅂㅇㅅㄴ.
+    assert index.search('ㅇㅅ') == [3, 5]
+    # Same span and start, order of build.
+    assert index.search('ㄷ') == [2, 4]
+
+
+def test_choseong_index_without_titles_is_not_ready():
+    index = ChoseongIndex()
+    assert not index.ready
+    assert index.best('ㄷㄷ') is None
+    index.build([])
+    assert not index.ready
+    index.build(TITLES, stamp='stamp')
+    assert index.ready and index.stamp == 'stamp'
+    index.clear()
+    assert not index.ready and index.stamp is None
+
+
+def test_title_index_finds_similar_title():
+    index = TitleIndex()
+    index.build(TITLES)
+    assert index.best('두근두근') == 2
+    assert index.best('두사람의 발렌타인') == 4
+    assert index.best('수영복 아스나') in {3, 5}
+    assert [key for key, _ in index.search('아스나', limit=2)] == [3, 5]
+
+
+@fixture
+def sess():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    sess = Session(bind=engine)
+    with sess.begin():
+        for id, title in TITLES:
+            sess.add(Scout(id=id, title=title, type=ScoutType.character))
+        sess.add(Scout(id=10, title='두근두근 무기', type=ScoutType.weapon))
+    invalidate(SCOUT_CACHE_TAG)
+    try:
+        yield sess
+    finally:
+        sess.close()
+        invalidate(SCOUT_CACHE_TAG)
+
+
+def test_scout_by_choseong(sess):
+    def find(type: ScoutType, title: str):
+        scout = get_similar_scout_by_title(type, title, sess)
+        return scout and scout.id
+
+    assert find(ScoutType.character, 'ㄷㄷ') == 2
+    assert find(ScoutType.character, 'ㅅㅂ ㅇㅅㄴ') == 3
+    assert find(ScoutType.weapon, 'ㄷㄷ') == 10
+    # Consonants which no title has find nothing rather than
+    # dissimilar title.
+    assert find(ScoutType.character, 'ㅎㅎㅎ') is None
+    assert find(ScoutType.character, '두근두근') == 2
+
+
+def test_scout_by_choseong_after_catalog_changed(sess):
+    assert get_similar_scout_by_title(ScoutType.character, 'ㄷㄷ', sess).id \
+        == 2
+    # Other process recreates scout with new id while stamp is cached.
+    with sess.begin():
+        sess.query(Scout).filter_by(id=2).delete()
+        sess.add(Scout(id=20, title='두근두근 발렌타인', version=2,
+                       type=ScoutType.character))
+    assert get_similar_scout_by_title(ScoutType.character, 'ㄷㄷ', sess).id \
+        == 20
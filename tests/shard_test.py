@@ -0,0 +1,133 @@
+import copy
+import logging
+import multiprocessing
+import pathlib
+import sys
+
+from attrdict import AttrDict
+
+from pytest import fixture, mark
+
+from strea.config import DEFAULT
+from strea.shard import Supervisor, shard_config
+
+
+class FakeProcess:
+
+    def __init__(self, target, args, name, daemon) -> None:
+        """Initialize"""
+
+        self.args = args
+        self.name = name
+        self.pid = None
+        self.exitcode = None
+
+    def start(self) -> None:
+        pass
+
+    def is_alive(self) -> bool:
+        return self.exitcode is None
+
+    def join(self) -> None:
+        pass
+
+
+class FakeContext:
+
+    Process = FakeProcess
+
+
+@fixture
+def config():
+    config = AttrDict(copy.deepcopy(DEFAULT))
+    config.update(LOG_LEVEL='WARNING', METRICS_PORT=9100)
+    return config
+
+
+def test_shard_config(config):
+    assert shard_config(config, 2).METRICS_PORT == 9102
+    assert config.METRICS_PORT == 9100
+    config.METRICS_PORT = 0
+    assert shard_config(config, 2).METRICS_PORT == 0
+
+
+def test_crashed_shard_is_restarted_with_backoff(config, monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr('time.monotonic', lambda: clock[0])
+    supervisor = Supervisor(
+        config,
+        2,
+        restart_delay=1.0,
+        max_restart_delay=4.0,
+        stable_after=60.0,
+        context=FakeContext(),
+    )
+    supervisor.running = True
+    supervisor.start(0)
+    supervisor.start(1)
+    assert supervisor.processes[1].args[1:] == (1, 2)
+
+    delays = []
+    for _ in range(4):
+        supervisor.processes[0].exitcode = 1
+        supervisor.reap()
+        delays.append(supervisor.pending[0] - clock[0])
+        clock[0] = supervisor.pending[0] - 0.1
+        supervisor.restart_due()
+        assert 0 not in supervisor.processes
+        clock[0] += 0.1
+        supervisor.restart_due()
+        assert 0 in supervisor.processes
+    assert delays == [1.0, 2.0, 4.0, 4.0]
+    assert supervisor.restarts == 4
+
+    # Shard which has run long enough starts backoff again.
+    clock[0] += 60.0
+    supervisor.processes[0].exitcode = 1
+    supervisor.reap()
+    assert supervisor.pending[0] - clock[0] == 1.0
+
+    # Normal exit is not restarted.
+    supervisor.processes[1].exitcode = 0
+    supervisor.reap()
+    assert 1 not in supervisor.processes and 1 not in supervisor.pending
+
+
+def crash_once(config: AttrDict, shard_id: int, shard_count: int) -> None:
+    marker = pathlib.Path(config.MARKER) / str(shard_id)
+    if shard_id == 1 and not marker.exists():
+        marker.touch()
+        sys.exit(3)
+    marker.with_suffix('.done').touch()
+
+
+@fixture
+def strea_logger():
+    logger = logging.getLogger('strea')
+    handlers, propagate = logger.handlers[:], logger.propagate
+    try:
+        yield logger
+    finally:
+        logger.handlers[:] = handlers
+        logger.propagate = propagate
+
+
+@mark.skipif(
+    'fork' not in multiprocessing.get_all_start_methods(),
+    reason='fork is not available',
+)
+def test_supervisor_runs_every_shard(config, tmpdir, strea_logger):
+    config.MARKER = str(tmpdir)
+    supervisor = Supervisor(
+        config,
+        3,
+        target=crash_once,
+        restart_delay=0.05,
+        context=multiprocessing.get_context('fork'),
+    )
+    supervisor.run()
+    assert supervisor.restarts == 1
+    assert sorted(p.name for p in pathlib.Path(str(tmpdir)).iterdir()) == [
+        '0.done', '1', '1.done', '2.done',
+    ]
+    assert not supervisor.processes
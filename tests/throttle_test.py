@@ -0,0 +1,69 @@
+from strea.throttle import Throttle, TokenBucket
+
+
+def make_throttle(**kwargs) -> Throttle:
+    options = {
+        'user_rate': 0.5,
+        'user_burst': 2,
+        'channel_rate': 10.0,
+        'channel_burst': 100,
+    }
+    options.update(kwargs)
+    return Throttle(**options)
+
+
+def test_bucket_refill_is_capped():
+    bucket = TokenBucket(rate=2.0, capacity=4, now=0.0)
+    bucket.tokens = 0
+    assert bucket.refill(0.5) == 1.0
+    assert bucket.refill(1.5) == 3.0
+    assert bucket.refill(100.0) == 4
+
+
+def test_burst_then_refill():
+    throttle = make_throttle()
+    assert throttle.consume('user', 'channel', now=0.0)
+    assert throttle.consume('user', 'channel', now=0.0)
+    assert not throttle.consume('user', 'channel', now=0.0)
+    assert not throttle.consume('user', 'channel', now=1.9)
+    assert throttle.consume('user', 'channel', now=2.0)
+    assert not throttle.consume('user', 'channel', now=2.0)
+    assert throttle.rejected == 3
+
+
+def test_users_have_own_buckets():
+    throttle = make_throttle()
+    for _ in range(2):
+        assert throttle.consume('a', 'channel', now=0.0)
+    assert not throttle.consume('a', 'channel', now=0.0)
+    assert throttle.consume('b', 'channel', now=0.0)
+
+
+def test_channel_bucket_limits_every_user():
+    throttle = make_throttle(channel_rate=1.0, channel_burst=3)
+    assert all(
+        throttle.consume(user, 'channel', now=0.0)
+        for user in ['a', 'b', 'c']
+    )
+    assert not throttle.consume('d', 'channel', now=0.0)
+    assert throttle.consume('d', 'channel', now=1.0)
+
+
+def test_rejected_consume_takes_nothing():
+    throttle = make_throttle(channel_rate=1.0, channel_burst=1)
+    assert throttle.consume('a', 'channel', now=0.0)
+    assert not throttle.consume('a', 'channel', now=0.0)
+    assert throttle.users['a'].tokens == 1
+    assert throttle.channels['channel'].tokens == 0
+
+
+def test_least_recently_used_key_is_dropped():
+    throttle = make_throttle(max_keys=2)
+    throttle.consume('a', 'x', now=0.0)
+    throttle.consume('b', 'x', now=0.0)
+    throttle.consume('a', 'x', now=0.0)
+    throttle.consume('c', 'x', now=0.0)
+    assert list(throttle.users) == ['a', 'c']
+    # Dropped user starts again with full bucket.
+    throttle.consume('b', 'x', now=0.0)
+    assert throttle.users['b'].tokens == 1
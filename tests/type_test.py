@@ -0,0 +1,83 @@
+from typing import (Any, Dict, List, Optional, Sequence, Set, Tuple,
+                    TypeVar, Union)
+
+from pytest import mark, raises
+
+from strea.type import (CONVERTERS, Namespace, cast, compile_converter,
+                        is_container)
+
+
+T = TypeVar('T')
+
+
+class Point(Namespace):
+
+    x: int
+    y: int
+
+
+class Line(Namespace):
+
+    start: Point
+    end: Point
+    label: Optional[str]
+
+
+@mark.parametrize('t, value, expected', [
+    (int, '3', 3),
+    (float, '0.5', 0.5),
+    (str, 'text', 'text'),
+    (Any, object, object),
+    (T, 'value', 'value'),
+    (type(None), 'value', None),
+    (List[int], ('1', '2'), [1, 2]),
+    (list, ('1', '2'), ['1', '2']),
+    (Sequence[float], ['1'], [1.0]),
+    (Set[int], ['1', '1', '2'], {1, 2}),
+    (Tuple[int, ...], ['1', '2'], (1, 2)),
+    (Tuple[int, str], ['1', '2'], (1, '2')),
+    (Tuple, ['1'], ('1',)),
+    (Dict[str, int], {'a': '1'}, {'a': 1}),
+    (Dict[int, List[int]], {'1': ['2']}, {1: [2]}),
+    (Union[int, str], '1', 1),
+    (Union[int, str], 'a', 'a'),
+    (Optional[int], '1', 1),
+    (Optional[str], None, None),
+    (Union[str, int, None], None, None),
+])
+def test_cast(t, value, expected):
+    result = cast(t, value)
+    assert result == expected
+    assert type(result) is type(expected)
+
+
+def test_union_without_matching_member():
+    with raises(ValueError):
+        cast(Union[int, float], 'a')
+
+
+def test_namespace_converts_fields():
+    line = Line(start={'x': '1', 'y': '2'}, end={'x': 3, 'y': '4'})
+    assert line.start == Point(x=1, y=2)
+    assert line.end == Point(x=3, y=4)
+    assert line.label is None
+    assert cast(Point, {'x': '5', 'y': '6'}) == Point(x=5, y=6)
+
+
+def test_converter_is_compiled_once():
+    converter = compile_converter(List[Tuple[int, str]])
+    assert compile_converter(List[Tuple[int, str]]) is converter
+    assert CONVERTERS[List[Tuple[int, str]]] is converter
+
+
+@mark.parametrize('t, expected', [
+    (List[int], True),
+    (Tuple[int, ...], True),
+    (Set[str], True),
+    (list, True),
+    (Dict[str, int], False),
+    (str, False),
+    (Optional[int], False),
+])
+def test_is_container(t, expected: bool):
+    assert is_container(t) is expected